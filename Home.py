@@ -7,6 +7,7 @@ import streamlit as st
 from utils.database import get_story_count
 from utils.translations import get_text, get_language_toggle, set_language
 from utils.ui_helpers import add_custom_css
+from utils.warmup import start_warm_up
 from utils.auth import get_contact_info, is_authenticated
 
 # Page configuration - MUST be first
@@ -20,6 +21,9 @@ st.set_page_config(
 # Add custom CSS for polish - AFTER page config
 add_custom_css()
 
+# Load the database schema and NLP models in the background, once per server
+start_warm_up()
+
 # Sidebar customization
 with st.sidebar:
 
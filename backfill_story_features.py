@@ -0,0 +1,57 @@
+"""
+Script to compute story_features for stories that don't have them yet
+Run this after bulk loads or a classifier change; it can be stopped and re-run at any time
+Usage: python backfill_story_features.py [batch_size]
+"""
+
+import time
+
+from utils.database import get_stories_needing_features, save_story_features_bulk
+from utils.nlp_model import CLASSIFIER_VERSION, analyze_batch
+
+DEFAULT_BATCH_SIZE = 2000
+
+
+def backfill_story_features(batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Stream stories missing current-version features in id order and store them batch by batch
+    Each batch is written in its own transaction, so an interrupted run keeps its progress
+    Returns the number of stories processed
+    """
+    print(f"\n🧠 Backfilling story features (classifier {CLASSIFIER_VERSION})...")
+    start = time.perf_counter()
+    processed = 0
+    last_id = 0
+
+    while True:
+        batch = get_stories_needing_features(CLASSIFIER_VERSION, after_id=last_id, limit=batch_size)
+        if not batch:
+            break
+
+        analyses = analyze_batch([story_text for _, story_text in batch])
+        written = save_story_features_bulk([
+            {**analysis.features(), 'story_id': story_id}
+            for (story_id, _), analysis in zip(batch, analyses)
+        ])
+        if not written:
+            print("❌ Stopping: the batch could not be saved (re-run to resume)")
+            break
+
+        processed += written
+        last_id = batch[-1][0]
+        rate = processed / max(time.perf_counter() - start, 1e-9)
+        print(f"   {processed:,} stories (up to id {last_id}) - {rate:,.0f} stories/s")
+
+    print(f"\n🎉 Backfilled features for {processed:,} stories in {time.perf_counter() - start:.1f}s")
+    return processed
+
+
+if __name__ == "__main__":
+    import sys
+
+    try:
+        size = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_BATCH_SIZE
+    except ValueError:
+        print("\n❌ Please provide a valid batch size: python backfill_story_features.py 2000")
+    else:
+        backfill_story_features(size)
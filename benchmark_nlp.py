@@ -0,0 +1,249 @@
+"""
+Benchmark script for the NLP keyword matching
+Run this to compare the compiled lexicons against the old per-keyword substring scan
+Usage: python benchmark_nlp.py [num_documents]
+"""
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from utils.language import detect_language
+from utils.lexicon import tokenize
+from utils.linear_model import train_linear_model
+from utils.nlp_model import (
+    EMOTION_KEYWORDS, EMOTION_LEXICON, EMOTION_LEXICONS, analysis_cache, detect_emotion_batch,
+    get_cache_stats, get_emotion_scorer
+)
+from utils.vader_lexicon import MappedSentimentAnalyzer, SentimentIntensityAnalyzer
+from utils.web_scraper import THEME_KEYWORDS, THEME_LEXICON, generate_synthetic_content
+
+# Extra sentences mixed into the synthetic corpus
+EXTRA_SENTENCES = [
+    "I feel so overwhelmed trying to balance work, taking care of my kids, and helping my aging parents.",
+    "This week has been exhausting. I'm working two jobs and I barely have time to sleep.",
+    "I feel guilty for wanting time for myself. When I take a break I feel selfish.",
+    "My anxiety has been really high lately and I worry about everything.",
+    "Things are getting a little better. I started setting small boundaries.",
+    "I'm angry but I don't know how to express it without causing drama.",
+    "I lost someone important to me and the grief feels unbearable.",
+    "They made me feel like my needs don't matter. Nobody will allow me to rest.",
+]
+
+# Spanish sentences for the bilingual corpus
+EXTRA_SENTENCES_ES = [
+    "Me siento agotada, trabajo todo el día y luego cuido a mis hijos y a mi mamá.",
+    "Tengo mucha ansiedad y no puedo dormir, me preocupa todo.",
+    "Siento culpa cuando tomo tiempo para mí, como si fuera egoísta.",
+    "Estoy abrumada con tantas responsabilidades en la casa y en el trabajo.",
+    "Poco a poco me siento mejor, estoy aprendiendo a poner límites.",
+    "Me da coraje que mi familia no respete mis decisiones.",
+    "Extraño mucho a mi abuela, el duelo todavía me duele.",
+    "Hoy me siento tranquila y agradecida, hay esperanza.",
+]
+
+
+def build_corpus(num_documents, seed=42, sentences=None):
+    """Build a synthetic corpus of 1-4 sentence documents"""
+    rng = random.Random(seed)
+    if sentences is None:
+        sentences = EXTRA_SENTENCES + [post['content'] for post in generate_synthetic_content()]
+    return [" ".join(rng.choices(sentences, k=rng.randint(1, 4))) for _ in range(num_documents)]
+
+
+def substring_scan(categories, text):
+    """The previous approach: one substring test per keyword"""
+    text_lower = text.lower()
+    scores = {}
+    for category, keywords in categories.items():
+        count = sum(1 for keyword in keywords if keyword in text_lower)
+        if count > 0:
+            scores[category] = count
+    return scores
+
+
+def time_it(label, func, corpus):
+    """Run func over the corpus and print documents per second"""
+    start = time.perf_counter()
+    for text in corpus:
+        func(text)
+    elapsed = time.perf_counter() - start
+    print(f"  {label.ljust(28)} {elapsed:7.2f}s  ({len(corpus) / elapsed:>10,.0f} docs/s)")
+    return elapsed
+
+
+def benchmark_lexicons(corpus):
+    """Compare substring scanning with the compiled lexicons"""
+    for name, categories, lexicon in [
+        ('Emotion keywords', EMOTION_KEYWORDS, EMOTION_LEXICON),
+        ('Theme keywords', THEME_KEYWORDS, THEME_LEXICON),
+    ]:
+        print(f"\n{name} ({sum(len(k) for k in categories.values())} keywords)")
+        baseline = time_it("substring scan (old)", lambda text: substring_scan(categories, text), corpus)
+        compiled = time_it("compiled lexicon count()", lexicon.count, corpus)
+        time_it("compiled lexicon scan()", lexicon.scan, corpus)
+        print(f"  speedup: {baseline / compiled:.1f}x")
+
+    # Scraped posts go through both lexicons, so tokenizing once is shared between them
+    print("\nEmotion + theme on the same text")
+
+    def both_substring(text):
+        substring_scan(EMOTION_KEYWORDS, text)
+        substring_scan(THEME_KEYWORDS, text)
+
+    def both_compiled(text):
+        words = tokenize(text)
+        EMOTION_LEXICON.count_tokens(words)
+        THEME_LEXICON.count_tokens(words)
+
+    baseline = time_it("substring scan (old)", both_substring, corpus)
+    compiled = time_it("shared tokens count_tokens()", both_compiled, corpus)
+    print(f"  speedup: {baseline / compiled:.1f}x")
+
+
+def benchmark_matrix(corpus):
+    """Compare per-document keyword scoring with the document x emotion matrix"""
+    print("\nKeyword scoring (no VADER, no cache)")
+    tokenizing = time_it("tokenize only", tokenize, corpus)
+
+    def per_document(text):
+        words = tokenize(text)
+        scores = EMOTION_LEXICON.count_tokens(words)
+        if scores:
+            primary = max(scores, key=scores.get)
+            min(scores[primary] / max(len(words) / 20, 1), 1.0)
+
+    baseline = time_it("per-document loop", per_document, corpus)
+
+    # Built before timing; best of three runs, as a shared machine is noisy
+    scorer = get_emotion_scorer()
+    matrix = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        scorer.score(corpus)
+        matrix = min(matrix, time.perf_counter() - start)
+    print(f"  {'matrix score()'.ljust(28)} {matrix:7.2f}s  ({len(corpus) / matrix:>10,.0f} docs/s)")
+    print(f"  speedup: {baseline / matrix:.1f}x  (tokenizing is {tokenizing / matrix:.0%} of the matrix time)")
+
+
+def benchmark_linear_model(corpus, training_documents=20000):
+    """Train the linear model on lexicon labels, then time batched and single-story inference"""
+    print(f"\nLinear model (trained on {min(len(corpus), training_documents):,} lexicon-labelled docs)")
+    training = corpus[:training_documents]
+    labels = [emotion for emotion, _, _ in detect_emotion_batch(training, workers=1)]
+    model = train_linear_model([tokenize(text) for text in training], labels)
+
+    token_lists = [tokenize(text) for text in corpus]
+    start = time.perf_counter()
+    model.predict(token_lists)
+    batched = time.perf_counter() - start
+    print(f"  {'batched predict()'.ljust(28)} {batched:7.2f}s  ({len(corpus) / batched:>10,.0f} docs/s)")
+
+    sample = token_lists[:2000]
+    start = time.perf_counter()
+    for words in sample:
+        model.predict([words])
+    single_ms = (time.perf_counter() - start) * 1000 / len(sample)
+    print(f"  {'single-story predict()'.ljust(28)} {single_ms:7.3f}ms per story (budget: 1 ms)")
+
+
+def benchmark_languages(num_documents):
+    """Time language detection and each language's lexicon on its own corpus"""
+    corpora = {
+        'en': build_corpus(num_documents // 2, seed=1),
+        'es': build_corpus(num_documents // 2, seed=2, sentences=EXTRA_SENTENCES_ES)
+    }
+    mixed = corpora['en'] + corpora['es']
+    random.Random(3).shuffle(mixed)
+
+    print(f"\nLanguage routing ({len(mixed):,} mixed en/es docs)")
+    time_it("detect_language()", detect_language, mixed)
+    for language, corpus in corpora.items():
+        time_it(f"{language} lexicon scan()", EMOTION_LEXICONS[language].scan, corpus)
+
+    # Routing pays for detection but matches one lexicon instead of every lexicon
+    def scan_all(text):
+        words = tokenize(text)
+        for lexicon in EMOTION_LEXICONS.values():
+            lexicon.count_tokens(words)
+
+    def routed(text):
+        EMOTION_LEXICONS[detect_language(text)].count_tokens(tokenize(text))
+
+    all_lexicons = time_it("scan every lexicon", scan_all, mixed)
+    routed_time = time_it("detect + one lexicon", routed, mixed)
+    print(f"  routing overhead: {routed_time / all_lexicons:.2f}x")
+
+    correct = sum(
+        1 for language, corpus in corpora.items() for text in corpus[:2000]
+        if detect_language(text) == language
+    )
+    checked = sum(min(len(corpus), 2000) for corpus in corpora.values())
+    print(f"  detection accuracy: {correct / max(checked, 1):.1%} on {checked:,} docs")
+
+
+def benchmark_vader(corpus, sample_size=5000):
+    """Compare the stock VADER analyzer with the memory-mapped lexicon"""
+    sample = corpus[:sample_size]
+    print(f"\nVADER lexicon ({len(sample):,} docs)")
+    MappedSentimentAnalyzer()  # compile the lexicon file outside the timings
+
+    for label, factory in [("stock (parsed dict)", SentimentIntensityAnalyzer),
+                           ("memory-mapped", MappedSentimentAnalyzer)]:
+        start = time.perf_counter()
+        analyzer = factory()
+        construct_ms = (time.perf_counter() - start) * 1000
+        time_it(label, analyzer.polarity_scores, sample)
+
+        # Heap the analyzer keeps per process (tracing slows scoring, so it is measured separately)
+        tracemalloc.start()
+        analyzer = factory()
+        for text in sample[:500]:
+            analyzer.polarity_scores(text)
+        retained_kb = tracemalloc.get_traced_memory()[0] / 1024
+        tracemalloc.stop()
+        print(f"  {''.ljust(28)} construct {construct_ms:6.2f}ms, {retained_kb:,.0f} KB private heap")
+
+
+def time_batch(workers, corpus, label=None, cold=True):
+    """Run detect_emotion_batch over the whole corpus and print documents per second"""
+    if cold:
+        analysis_cache.clear()
+    start = time.perf_counter()
+    detect_emotion_batch(corpus, workers=workers)
+    elapsed = time.perf_counter() - start
+    label = label or f"workers={workers}"
+    print(f"  {label.ljust(28)} {elapsed:7.2f}s  ({len(corpus) / elapsed:>10,.0f} docs/s)")
+    return elapsed
+
+
+def benchmark_batch(corpus):
+    """Compare in-process detect_emotion_batch with the process pool"""
+    cores = os.cpu_count() or 1
+    print(f"\ndetect_emotion_batch ({cores} cores)")
+    serial = time_batch(1, corpus)
+    if cores > 1:
+        parallel = time_batch(cores, corpus)
+        print(f"  speedup: {serial / parallel:.1f}x")
+
+    # Same corpus again: every text is now answered by the analysis cache
+    cached = time_batch(1, corpus, label="warm cache", cold=False)
+    print(f"  speedup: {serial / cached:.1f}x  (cache: {get_cache_stats()})")
+
+
+if __name__ == "__main__":
+    num_documents = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    print("=" * 80)
+    print(f"NLP BENCHMARK - {num_documents:,} documents")
+    print("=" * 80)
+
+    corpus = build_corpus(num_documents)
+    benchmark_lexicons(corpus)
+    benchmark_matrix(corpus)
+    benchmark_linear_model(corpus)
+    benchmark_languages(min(num_documents, 20000))
+    benchmark_vader(corpus)
+    benchmark_batch(corpus)
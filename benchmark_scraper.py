@@ -0,0 +1,345 @@
+"""
+Benchmark script for the web scraper's fetch layer
+Runs against local stub HTTP servers (one per simulated host, each with its own latency), so no network is needed
+Usage: python benchmark_scraper.py [num_hosts] [pages_per_host] [latency_ms]
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import warnings
+from email.utils import formatdate
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from utils import database
+from utils.feed_reader import fetch_feed
+from utils.fetch_engine import FetchEngine, create_session
+from utils.http_cache import HTTPCache
+from utils.web_scraper import (
+    BLOG_HEADERS, crawl_blog_sources, is_wellness_related, parse_blog_content, parse_reddit_listing
+)
+
+
+def stub_blog_page(host_number, page_number, posts=5):
+    """HTML page in the shape parse_blog_content() looks for"""
+    articles = "".join(
+        f'<article class="post"><h2 class="title">Post {host_number}-{page_number}-{i}</h2>'
+        f'<div class="content">Balancing work stress and family expectations while learning '
+        f'about boundaries and self-care. Some weeks the burnout wins, but therapy and '
+        f'community help me keep going. ({i})</div></article>'
+        for i in range(posts)
+    )
+    return f"<html><body>{articles}</body></html>".encode("utf-8")
+
+
+def stub_reddit_listing(posts=10):
+    """JSON listing in the shape parse_reddit_listing() reads"""
+    children = [{'data': {
+        'title': f"Dealing with anxiety and family expectations ({i})",
+        'selftext': "Some days the stress of being the strong one is a lot.",
+        'created_utc': 1_700_000_000 + i
+    }} for i in range(posts)]
+    return json.dumps({'data': {'children': children}}).encode("utf-8")
+
+
+# Index excerpts whose link is rejected by the frontier or yields no article
+UNFOLLOWED_EXCERPTS = {'elsewhere': "https://elsewhere.example/story", 'gone': "/gone"}
+
+
+def stub_site(num_articles):
+    """
+    Routes of a blog whose index links every article; every third article is off-topic.
+    Articles link onwards to others, with tracking parameters and fragments that
+    must dedup, plus one link to another site that must not be followed.
+    The index opens with two excerpts whose links lead nowhere useful (another
+    site, a missing page): the crawl must keep those excerpts as they are
+    """
+    relevant = "Setting boundaries with family, caregiving stress and finding time for self-care and healing."
+    off_topic = "Our favourite weeknight recipes, a playlist for the road and this month's book club pick."
+
+    def article(i):
+        text = off_topic if i % 3 == 0 else relevant
+        onward = "".join(
+            f'<a href="/posts/{j}?utm_source=blog#top">Read more</a>'
+            for j in ((i * 7 + 1) % num_articles, (i * 11 + 2) % num_articles)
+        )
+        return (f"<html><head><title>Post {i}</title></head><body><article><h1>Post {i}</h1>"
+                f"<p>{text} {text}</p></article>{onward}"
+                f'<a href="https://elsewhere.example/">Elsewhere</a></body></html>').encode("utf-8")
+
+    index = "".join(
+        f'<div class="post"><a href="{link}">Unfollowed</a><div class="excerpt">{relevant} ({name}) {"." * 40}</div></div>'
+        for name, link in UNFOLLOWED_EXCERPTS.items()
+    ) + "".join(
+        f'<div class="post"><a href="/posts/{i}">Post {i}</a>'
+        f'<div class="excerpt">{off_topic if i % 3 == 0 else relevant} ({i}) {"." * 40}</div></div>'
+        for i in range(num_articles)
+    )
+    routes = {"/blog": (f"<html><body>{index}</body></html>".encode("utf-8"), "text/html")}
+    routes.update({f"/posts/{i}": (article(i), "text/html") for i in range(num_articles)})
+    return routes
+
+
+# Fixed Last-Modified for every stub page
+STUB_LAST_MODIFIED = "Mon, 06 Jan 2025 12:00:00 GMT"
+
+
+def stub_rss_feed(num_items, newest=1_700_000_000):
+    """RSS 2.0 feed of num_items entries, newest first, one hour apart"""
+    items = "".join(
+        f"<item><title>Entry {i}</title><link>https://example.org/posts/{i}</link>"
+        f"<guid>https://example.org/posts/{i}</guid>"
+        f"<pubDate>{formatdate(newest - i * 3600, usegmt=True)}</pubDate>"
+        f"<description>&lt;p&gt;Notes on caregiving, boundaries and the stress of family "
+        f"expectations. Rest is not a reward, it is part of healing. ({i})&lt;/p&gt;</description></item>"
+        for i in range(num_items)
+    )
+    return (f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            f"<title>Stub feed</title>{items}</channel></rss>").encode("utf-8")
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Serves the server's routes after sleeping for its latency
+    Every response carries an ETag (hash of the body) and Last-Modified, and a
+    matching If-None-Match gets 304 Not Modified, like a well-behaved origin
+    """
+
+    protocol_version = "HTTP/1.1"  # keep-alive, so pooled connections are reused
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        route = self.server.routes.get(self.path.split("?")[0])
+        if route is None:
+            self.send_error(404)
+            return
+        body, content_type = route
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", STUB_LAST_MODIFIED)
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client stopped reading early (e.g. a feed's high-water mark)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_server(routes, latency):
+    """Start a stub server on a free local port; returns its base URL and the server"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.routes = routes
+    server.latency = latency
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server
+
+
+def start_stub_hosts(num_hosts, pages_per_host, latency):
+    """One stub server per simulated host, each serving blog pages and a Reddit-style listing"""
+    urls, servers = [], []
+    for host_number in range(num_hosts):
+        routes = {
+            f"/blog/{page}": (stub_blog_page(host_number, page), "text/html")
+            for page in range(pages_per_host)
+        }
+        routes["/r/wellness/hot.json"] = (stub_reddit_listing(), "application/json")
+        base_url, server = start_stub_server(routes, latency)
+        servers.append(server)
+        urls.extend(f"{base_url}{path}" for path in routes)
+    return urls, servers
+
+
+def parse_result(url, content):
+    """Parse a fetched page the way collect_public_sources() does"""
+    if url.endswith(".json"):
+        return parse_reddit_listing(json.loads(content), "wellness")
+    return parse_blog_content(content, url)
+
+
+def benchmark_fetch(num_hosts, pages_per_host, latency):
+    """Compare one-at-a-time requests.get with the concurrent fetch engine"""
+    urls, servers = start_stub_hosts(num_hosts, pages_per_host, latency)
+    print(f"\nFetching {len(urls)} URLs from {num_hosts} hosts ({latency * 1000:.0f} ms latency each)")
+
+    start = time.perf_counter()
+    sequential_items = 0
+    for url in urls:
+        response = requests.get(url, headers=BLOG_HEADERS, timeout=10)
+        sequential_items += len(parse_result(url, response.content))
+    sequential = time.perf_counter() - start
+    print(f"  {'sequential requests.get'.ljust(28)} {sequential:7.2f}s  ({sequential_items} items)")
+
+    # Polite per-host rate, fast enough that the stub latency dominates
+    host_rate = 1 / latency
+    engine = FetchEngine(max_concurrency=num_hosts * 2, host_rate=host_rate, host_burst=2)
+    start = time.perf_counter()
+    results = engine.fetch_all([{'url': url, 'headers': BLOG_HEADERS} for url in urls])
+    concurrent_items = sum(len(parse_result(result['url'], result['content'])) for result in results)
+    concurrent = time.perf_counter() - start
+    errors = sum(1 for result in results if result['error'])
+    print(f"  {'fetch engine'.ljust(28)} {concurrent:7.2f}s  ({concurrent_items} items, {errors} errors)")
+
+    # Each host's first `burst` requests start at once, the rest are spaced 1/rate apart
+    slowest_host = max(pages_per_host + 1 - 2, 0) / host_rate + latency
+    print(f"  speedup: {sequential / concurrent:.1f}x  (slowest host alone at {host_rate:.0f} req/s, "
+          f"burst 2: ~{slowest_host:.2f}s)")
+
+    for server in servers:
+        server.shutdown()
+
+
+def benchmark_revalidation(num_hosts, pages_per_host, latency):
+    """Crawl the same unchanged stub sources twice through the HTTP cache"""
+    urls, servers = start_stub_hosts(num_hosts, pages_per_host, latency)
+    print(f"\nRe-crawling {len(urls)} unchanged URLs through the HTTP cache")
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = HTTPCache(os.path.join(directory, "http_cache.db"))
+        engine = FetchEngine(max_concurrency=num_hosts * 2, host_rate=1 / latency, host_burst=2, cache=cache)
+        fetches = [{'url': url, 'headers': BLOG_HEADERS} for url in urls]
+
+        for label in ["first crawl", "second crawl"]:
+            start = time.perf_counter()
+            results = engine.fetch_all(fetches)
+            elapsed = time.perf_counter() - start
+            transferred = sum(result['bytes_transferred'] for result in results)
+            unchanged = sum(1 for result in results if result['not_modified'])
+            print(f"  {label.ljust(28)} {elapsed:7.2f}s  {transferred:>9,} body bytes, "
+                  f"{unchanged}/{len(results)} answered 304")
+        print(f"  cache: {cache.stats()}")
+
+    for server in servers:
+        server.shutdown()
+
+
+def measure(func):
+    """(seconds, peak traced KB, result) for one call; timed and traced in separate runs"""
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+    return elapsed, peak_kb, result
+
+
+def benchmark_feeds(num_items):
+    """Compare html.parser on a whole feed with the streaming feed reader"""
+    body = stub_rss_feed(num_items)
+    base_url, server = start_stub_server({"/feed": (body, "application/rss+xml")}, 0)
+    url = f"{base_url}/feed"
+    session = create_session()
+    print(f"\nFeed with {num_items:,} entries ({len(body) / 1e6:.1f} MB)")
+
+    def old_path():
+        response = session.get(url, headers=BLOG_HEADERS, timeout=60)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # bs4 warns that this is XML, which is the point
+            return parse_blog_content(response.content, url, max_articles=num_items)
+
+    def streaming(since=None):
+        return fetch_feed(session, url, BLOG_HEADERS, timeout=60, since=since,
+                          is_relevant=is_wellness_related)
+
+    elapsed, peak_kb, articles = measure(old_path)
+    print(f"  {'html.parser (old)'.ljust(28)} {elapsed:7.2f}s  peak {peak_kb:>9,.0f} KB  "
+          f"{len(articles):>6,} items")
+
+    elapsed, peak_kb, result = measure(streaming)
+    print(f"  {'streaming iterparse'.ljust(28)} {elapsed:7.2f}s  peak {peak_kb:>9,.0f} KB  "
+          f"{len(result['items']):>6,} items")
+
+    # Incremental run: only the 100 newest entries are past the high-water mark
+    since = result['items'][100]['published_epoch']
+    elapsed, peak_kb, result = measure(lambda: streaming(since))
+    print(f"  {'streaming, stop at mark'.ljust(28)} {elapsed:7.2f}s  peak {peak_kb:>9,.0f} KB  "
+          f"{len(result['items']):>6,} items, {result['bytes_transferred'] / 1e6:.2f} MB read")
+
+    server.shutdown()
+
+
+def benchmark_crawl(num_articles, domain_budget=40):
+    """Crawl a stub blog through the frontier, then interrupt and resume a second crawl"""
+    base_url, server = start_stub_server(stub_site(num_articles), 0.02)
+    seed = f"{base_url}/blog"
+    print(f"\nCrawling a {num_articles}-article stub blog (budget {domain_budget} pages)")
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Frontier checkpoints go to a scratch database, never the app's
+        database.DB_PATH = Path(directory) / "voces.db"
+        engine = FetchEngine(max_concurrency=4, host_rate=200, host_burst=4)
+
+        start = time.perf_counter()
+        items = crawl_blog_sources([seed], engine=engine, domain_budget=domain_budget, batch_size=8)
+        elapsed = time.perf_counter() - start
+        articles = [item for item in items if item.get('url', '').startswith(f"{base_url}/posts/")]
+        print(f"  {'frontier crawl'.ljust(28)} {elapsed:7.2f}s  {len(articles)} relevant articles "
+              f"from {domain_budget} pages")
+
+        # Regression check: excerpts whose link can't be followed are returned as they are
+        kept = [name for name in UNFOLLOWED_EXCERPTS if any(f"({name})" in item['content'] for item in items)]
+        print(f"  unfollowed excerpts kept: {len(kept)}/{len(UNFOLLOWED_EXCERPTS)}")
+        assert len(kept) == len(UNFOLLOWED_EXCERPTS), "crawl dropped index excerpts"
+
+        # Interrupt after three batches, then resume from the checkpoint: the
+        # items found before the interruption must come back with the rest
+        calls = {'count': 0}
+        original_fetch_all = engine.fetch_all
+
+        def failing_fetch_all(requests_to_fetch):
+            calls['count'] += 1
+            if calls['count'] == 4:
+                raise KeyboardInterrupt
+            return original_fetch_all(requests_to_fetch)
+
+        engine.fetch_all = failing_fetch_all
+        try:
+            crawl_blog_sources([seed], engine=engine, domain_budget=domain_budget, batch_size=8,
+                               crawl_name='resume_check')
+        except KeyboardInterrupt:
+            print("  interrupted after three batches")
+        engine.fetch_all = original_fetch_all
+        resumed = crawl_blog_sources([seed], engine=engine, domain_budget=domain_budget, batch_size=8,
+                                     crawl_name='resume_check')
+        print(f"  resumed crawl: {len(resumed)} items (uninterrupted: {len(items)}), checkpoint cleared: "
+              f"{database.get_crawl_frontier('resume_check') is None}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    num_hosts = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    pages_per_host = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    latency_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 200
+
+    print("=" * 80)
+    print("SCRAPER FETCH BENCHMARK")
+    print("=" * 80)
+
+    benchmark_fetch(num_hosts, pages_per_host, latency_ms / 1000)
+    benchmark_revalidation(num_hosts, pages_per_host, latency_ms / 1000)
+    benchmark_feeds(20000)
+    benchmark_crawl(200)
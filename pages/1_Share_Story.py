@@ -3,17 +3,16 @@ Share Story Page - Anonymous story submission form
 """
 
 import streamlit as st
-from utils.database import save_story, update_story_emotion
+from utils.submission import submit_story
 from utils.privacy import (
-    sanitize_text, 
     check_for_names, 
     validate_story_length, 
     get_privacy_notice,
     get_consent_text
 )
-from utils.nlp_model import detect_emotion
 from utils.translations import get_text, get_language_toggle, set_language
 from utils.ui_helpers import add_custom_css, show_loading
+from utils.warmup import start_warm_up
 
 # Page configuration - MUST be first
 st.set_page_config(
@@ -25,6 +24,9 @@ st.set_page_config(
 # Add custom CSS
 add_custom_css()
 
+# Load the database schema and NLP models in the background, once per server
+start_warm_up()
+
 # Get current language (set globally in Home.py)
 lang = get_language_toggle()
 
@@ -129,14 +131,19 @@ if not st.session_state.form_submitted:
             for error in errors:
                 st.error(error)
         else:
-            # Sanitize text
-            cleaned_story, sanitize_warnings = sanitize_text(story_text)
-            cleaned_note, note_warnings = sanitize_text(practitioner_note)
+            # Sanitize, detect emotion and save in a single transaction
+            with show_loading("💫 Processing your story..."):
+                result = submit_story(
+                    story_text=story_text,
+                    support_choices=support_choices,
+                    practitioner_note=practitioner_note,
+                    language=lang
+                )
             
             # Show warnings if any personal info was removed
-            if sanitize_warnings or note_warnings:
+            if result['warnings']:
                 st.warning("⚠️ We detected and removed some personal information to protect your privacy:")
-                for warning in sanitize_warnings + note_warnings:
+                for warning in result['warnings']:
                     st.write(f"- {warning}")
             
             # Show name warning if detected
@@ -145,29 +152,18 @@ if not st.session_state.form_submitted:
                     st.warning(f"⚠️ {warning}")
                 st.info("Your story will still be submitted, but consider if you've shared more than you intended.")
             
-            # Save to database
-            with show_loading("💫 Processing your story..."):
-                story_id = save_story(
-                    story_text=cleaned_story,
-                    support_choices=support_choices,
-                    practitioner_note=cleaned_note
-                )
+            if result['story_id']:
+                # Store emotion info in session state for confirmation page
+                # (not available yet when labelling runs in the background)
+                analysis = result['analysis']
+                if analysis:
+                    st.session_state.detected_emotion = analysis.primary_emotion
+                    st.session_state.emotion_confidence = analysis.confidence
                 
-                if story_id:
-                    # Detect emotion using NLP
-                    emotion, confidence, all_emotions = detect_emotion(cleaned_story)
-                    
-                    # Update story with emotion label
-                    update_story_emotion(story_id, emotion, confidence)
-                    
-                    # Store emotion info in session state for confirmation page
-                    st.session_state.detected_emotion = emotion
-                    st.session_state.emotion_confidence = confidence
-                    
-                    st.session_state.form_submitted = True
-                    st.rerun()
-                else:
-                    st.error("Something went wrong. Please try again or contact support.")
+                st.session_state.form_submitted = True
+                st.rerun()
+            else:
+                st.error("Something went wrong. Please try again or contact support.")
 
 else:
     # Success message after submission
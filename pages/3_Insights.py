@@ -5,7 +5,7 @@ Basic analytics view (will enhance with emotion tagging in Week 2)
 import streamlit as st
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 # Plotly imports with error handling
 try:
     import plotly.express as px
@@ -16,10 +16,18 @@ except ImportError:
     
 from utils.database import (
     get_all_stories, 
+    get_stories_page,
+    story_cursor,
+    count_stories,
+    count_stories_since,
+    get_weekly_emotion_counts,
+    count_term_mentions,
     get_story_count, 
     get_support_distribution,
+    get_emotion_support_crosstab,
     get_emotion_distribution,
     get_external_sentiment,
+    get_external_count,
     get_external_emotion_distribution,
     get_theme_distribution
 )
@@ -34,6 +42,7 @@ from utils.export_data import (
 )
 from utils.translations import get_text, get_language_toggle, set_language
 from utils.ui_helpers import add_custom_css, show_loading
+from utils.warmup import start_warm_up
 from utils.auth import check_admin_access, logout, get_current_user
 
 # Page configuration
@@ -46,6 +55,9 @@ st.set_page_config(
 # Add custom CSS
 add_custom_css()
 
+# Load the database schema and NLP models in the background, once per server
+start_warm_up()
+
 # Check admin access before showing dashboard
 if not check_admin_access():
     st.stop()
@@ -71,6 +83,7 @@ story_count = get_story_count()
 support_dist = get_support_distribution()
 emotion_dist = get_emotion_distribution()
 external_sentiments = get_external_sentiment()
+external_total = get_external_count()
 external_emotion_dist = get_external_emotion_distribution()
 
 with col1:
@@ -82,7 +95,7 @@ with col1:
 with col2:
     st.metric(
         label=get_text('external_sources', lang),
-        value=len(external_sentiments)
+        value=external_total
     )
 
 with col3:
@@ -98,13 +111,11 @@ with col3:
         st.metric(label=get_text('top_emotion', lang), value="N/A")
 
 with col4:
-    # Calculate stories from last 7 days
-    all_stories = get_all_stories()
-    recent_stories = [s for s in all_stories 
-                     if datetime.fromisoformat(s['timestamp']) > datetime.now() - timedelta(days=7)]
+    # Calculate stories from last 7 days (indexed range count, timestamps are stored in UTC)
+    stories_this_week = count_stories_since(datetime.now(timezone.utc) - timedelta(days=7))
     st.metric(
         label="Stories This Week",
-        value=len(recent_stories)
+        value=stories_this_week
     )
 
 st.markdown("---")
@@ -184,7 +195,7 @@ if emotion_dist and external_emotion_dist:
         
         # Calculate percentages
         internal_pct = (internal_count / story_count * 100) if story_count > 0 else 0
-        external_pct = (external_count / len(external_sentiments) * 100) if len(external_sentiments) > 0 else 0
+        external_pct = (external_count / external_total * 100) if external_total > 0 else 0
         
         comparison_data.append({
             'Emotion': get_emotion_label_display(emotion),
@@ -275,7 +286,7 @@ if external_sentiments:
             theme_data.append({
                 'Theme': theme_display,
                 'Count': count,
-                'Percentage': round(count / len(external_sentiments) * 100, 1)
+                'Percentage': round(count / external_total * 100, 1)
             })
         
         theme_df = pd.DataFrame(theme_data).sort_values('Count', ascending=False)
@@ -311,30 +322,18 @@ st.markdown("---")
 st.markdown(f"## {get_text('trend_analysis', lang)}")
 st.markdown(get_text('trend_analysis_desc', lang))
 
-# Get all stories for trend analysis
-all_stories_trend = get_all_stories()
-
-if len(all_stories_trend) > 0:
-    # Prepare data for trend analysis
-    trend_data = []
-    for story in all_stories_trend:
-        if story['emotion_label']:
-            # Parse date and get week number
-            story_date = datetime.fromisoformat(story['timestamp'])
-            week_start = story_date - timedelta(days=story_date.weekday())
-            week_label = week_start.strftime('%Y-%m-%d')
-            
-            trend_data.append({
-                'Week': week_label,
-                'Emotion': get_text(story['emotion_label'], lang),
-                'Count': 1
-            })
+if story_count > 0:
+    # Weekly counts are grouped in SQL on the generated created_week column
+    trend_data = [
+        {'Week': week, 'Emotion': get_text(emotion, lang), 'Count': count}
+        for week, emotion, count in get_weekly_emotion_counts()
+    ]
     
     if trend_data:
         trend_df = pd.DataFrame(trend_data)
         
         # Group by week and emotion
-        weekly_trends = trend_df.groupby(['Week', 'Emotion']).size().reset_index(name='Count')
+        weekly_trends = trend_df.groupby(['Week', 'Emotion'])['Count'].sum().reset_index()
         
         # Check if we have enough weeks
         unique_weeks = weekly_trends['Week'].nunique()
@@ -486,9 +485,6 @@ st.markdown("---")
 st.markdown("## 📝 Recent Community Voices")
 st.markdown("*Anonymous story excerpts to understand community needs*")
 
-# Get all stories first
-all_stories = get_all_stories()
-
 # Time filter
 time_filter = st.radio(
     "Show stories from:",
@@ -497,42 +493,31 @@ time_filter = st.radio(
 )
 
 if time_filter == "Last 7 days":
-    cutoff = datetime.now() - timedelta(days=7)
+    cutoff = datetime.now(timezone.utc) - timedelta(days=7)
 elif time_filter == "Last 30 days":
-    cutoff = datetime.now() - timedelta(days=30)
+    cutoff = datetime.now(timezone.utc) - timedelta(days=30)
 else:
-    cutoff = datetime.min
+    cutoff = None
 
-filtered_stories = [
-    s for s in all_stories 
-    if datetime.fromisoformat(s['timestamp']) > cutoff
-]
+# Only the count is needed up front; stories are fetched one page at a time below
+filtered_count = count_stories(since=cutoff)
 
 st.markdown("---")
 
-# Emotion-Support Cross Analysis (moved here after filtered_stories is defined)
+# Emotion-Support Cross Analysis (moved here after the time filter is defined)
 st.markdown("## 🔗 Emotion-Support Matching")
 st.markdown("*Which emotions are paired with which support requests?*")
 
-if filtered_stories and len(filtered_stories) >= 3:
-    # Create cross-analysis data
-    emotion_support_data = []
-    
-    for story in filtered_stories:
-        if story['emotion_label']:
-            emotion_display = get_emotion_label_display(story['emotion_label'])
-            for support in story['support_choices']:
-                emotion_support_data.append({
-                    'Emotion': emotion_display,
-                    'Support': support
-                })
-    
-    if emotion_support_data:
-        es_df = pd.DataFrame(emotion_support_data)
-        
-        # Create heatmap data
-        heatmap_data = es_df.groupby(['Emotion', 'Support']).size().reset_index(name='Count')
-        heatmap_pivot = heatmap_data.pivot(index='Emotion', columns='Support', values='Count').fillna(0)
+if filtered_count >= 3:
+    # Crosstab is computed in SQL from the story_support table
+    crosstab = get_emotion_support_crosstab(since=cutoff)
+    
+    if crosstab['emotions'] and crosstab['supports']:
+        heatmap_pivot = pd.DataFrame(
+            crosstab['counts'],
+            index=[get_emotion_label_display(emotion) for emotion in crosstab['emotions']],
+            columns=crosstab['supports']
+        ).sort_index()
         
         # Create heatmap with text annotations
         fig = go.Figure(data=go.Heatmap(
@@ -569,21 +554,30 @@ st.markdown("---")
 st.markdown("---")
 
 # Display filtered stories
-if filtered_stories:
-    st.info(f"📊 {len(filtered_stories)} {get_text('total_stories_period', lang)}")
+if filtered_count:
+    st.info(f"📊 {filtered_count} {get_text('total_stories_period', lang)}")
     
-    # Initialize pagination in session state
-    if 'story_page' not in st.session_state:
+    # Initialize pagination in session state (restart when the time filter changes)
+    if 'story_page' not in st.session_state or st.session_state.get('story_page_filter') != time_filter:
         st.session_state.story_page = 0
+        st.session_state.story_page_anchor = None
+        st.session_state.story_page_filter = time_filter
     
     # Stories per page
     STORIES_PER_PAGE = 5
-    total_pages = (len(filtered_stories) - 1) // STORIES_PER_PAGE + 1
+    total_pages = (filtered_count - 1) // STORIES_PER_PAGE + 1
     
-    # Get current page stories
-    start_idx = st.session_state.story_page * STORIES_PER_PAGE
-    end_idx = start_idx + STORIES_PER_PAGE
-    current_page_stories = filtered_stories[start_idx:end_idx]
+    # Get current page stories - keyset pagination reads only the rows shown
+    anchor = st.session_state.story_page_anchor
+    if anchor is None:
+        current_page_stories = get_stories_page(limit=STORIES_PER_PAGE, since=cutoff)
+    else:
+        current_page_stories = get_stories_page(
+            cursor=anchor['cursor'],
+            limit=anchor['limit'],
+            since=cutoff,
+            before=anchor['before']
+        )
     
     # Display stories in expandable cards (cleaner than table for full text)
     for story in current_page_stories:
@@ -626,11 +620,17 @@ if filtered_stories:
     with col1:
         if st.button(get_text('first', lang), disabled=(st.session_state.story_page == 0)):
             st.session_state.story_page = 0
+            st.session_state.story_page_anchor = None
             st.rerun()
     
     with col2:
         if st.button(get_text('previous', lang), disabled=(st.session_state.story_page == 0)):
             st.session_state.story_page -= 1
+            st.session_state.story_page_anchor = {
+                'cursor': story_cursor(current_page_stories[0]),
+                'limit': STORIES_PER_PAGE,
+                'before': True
+            }
             st.rerun()
     
     with col3:
@@ -639,11 +639,22 @@ if filtered_stories:
     with col4:
         if st.button(get_text('next', lang), disabled=(st.session_state.story_page >= total_pages - 1)):
             st.session_state.story_page += 1
+            st.session_state.story_page_anchor = {
+                'cursor': story_cursor(current_page_stories[-1]),
+                'limit': STORIES_PER_PAGE,
+                'before': False
+            }
             st.rerun()
     
     with col5:
         if st.button(get_text('last', lang), disabled=(st.session_state.story_page >= total_pages - 1)):
             st.session_state.story_page = total_pages - 1
+            # The last page holds whatever is left over after the full pages
+            st.session_state.story_page_anchor = {
+                'cursor': None,
+                'limit': filtered_count - (total_pages - 1) * STORIES_PER_PAGE,
+                'before': True
+            }
             st.rerun()
 
 else:
@@ -654,19 +665,13 @@ st.markdown("---")
 # Patterns & Insights
 st.markdown("## 💡 Key Patterns")
 
-if len(filtered_stories) >= 3:
-    # Common themes (basic text analysis for now)
-    all_text = " ".join([s['story_text'].lower() for s in filtered_stories])
-    
+if filtered_count >= 3:
     # Common words (simple version)
     stress_words = ['stress', 'overwhelm', 'anxiety', 'tired', 'exhausted', 
                    'pressure', 'family', 'work', 'guilt', 'worry']
     
-    found_themes = {}
-    for word in stress_words:
-        count = all_text.count(word)
-        if count > 0:
-            found_themes[word] = count
+    # Mentions are counted in SQL rather than by joining every story's text here
+    found_themes = count_term_mentions(stress_words, since=cutoff)
     
     if found_themes:
         col1, col2 = st.columns(2)
@@ -704,8 +709,8 @@ if story_count > 0:
         suggestions.append("**Low Awareness**: Some support types are rarely selected. Consider educating community about these options.")
     
     # Recent activity
-    if len(recent_stories) > 5:
-        suggestions.append(f"**Active Community**: {len(recent_stories)} stories this week shows strong engagement. Great time to launch new offerings!")
+    if stories_this_week > 5:
+        suggestions.append(f"**Active Community**: {stories_this_week} stories this week shows strong engagement. Great time to launch new offerings!")
     
     for suggestion in suggestions:
         st.success(suggestion)
@@ -794,7 +799,7 @@ if story_count > 0:
         story_count=story_count,
         emotion_dist=emotion_dist,
         support_dist=support_dist,
-        external_count=len(external_sentiments),
+        external_count=external_total,
         external_emotion_dist=external_emotion_dist,
         theme_dist=theme_dist_export
     )
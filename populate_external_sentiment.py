@@ -1,59 +1,63 @@
 """
 Script to collect and populate external sentiment data
 Run this to add external Latina wellness content for comparative analysis
+Usage: python populate_external_sentiment.py [--live] [--follow-links]
+Runs are incremental: posts ingested by an earlier run are skipped before classification
 """
 
+from utils.crawl_state import CrawlState
 from utils.web_scraper import collect_external_content
-from utils.database import save_external_sentiment
-from utils.nlp_model import detect_emotion
+from utils.database import save_external_sentiment_bulk
 
 
-def populate_external_sentiment():
+def populate_external_sentiment(use_synthetic=True, follow_links=False):
     """
     Collect external content and analyze sentiment
+    Only items not seen by earlier runs are classified and inserted;
+    follow_links also crawls the articles blog index pages link to
     """
     print("=" * 80)
     print("EXTERNAL SENTIMENT COLLECTION")
     print("=" * 80)
     
-    # Collect external content (using synthetic for demo)
+    # Collect external content (synthetic for demo unless --live)
     print("\n🌐 Collecting external content...")
-    external_posts = collect_external_content(use_synthetic=True)
+    crawl_state = CrawlState()
+    external_posts = collect_external_content(use_synthetic=use_synthetic, crawl_state=crawl_state,
+                                              follow_links=follow_links)
     
     if not external_posts:
-        print("❌ No external content collected")
+        # Nothing left to store, so the deferred validators can be committed
+        crawl_state.save()
+        print("✅ No new external content since the last run")
         return
     
     print(f"\n🧠 Analyzing emotions for {len(external_posts)} posts...\n")
     
-    success_count = 0
+    # Classify and insert all posts in one batch
+    sentiment_ids = save_external_sentiment_bulk([
+        {
+            'text_snippet': post['content'][:500],  # Limit to 500 chars
+            'content': post['content'],
+            'theme': post['theme'],
+            'source_type': post['source_type'],
+            'source': post['source'],
+            'item_key': post['item_key'],
+            'content_hash': post['content_hash']
+        }
+        for post in external_posts
+    ])
+    
+    # Advance the high-water marks only once everything new is stored (a failed save raises first)
+    crawl_state.save()
     
     for i, post in enumerate(external_posts, 1):
-        try:
-            # Analyze emotion
-            emotion, confidence, _ = detect_emotion(post['content'])
-            
-            # Save to database
-            sentiment_id = save_external_sentiment(
-                text_snippet=post['content'][:500],  # Limit to 500 chars
-                emotion_label=emotion,
-                theme=post['theme'],
-                source_type=post['source_type']
-            )
-            
-            if sentiment_id:
-                print(f"✅ Post {i}/{len(external_posts)}: {emotion} | Theme: {post['theme']}")
-                print(f"   Source: {post['source_type']} - {post['source']}")
-                print(f"   Preview: {post['content'][:60]}...")
-                print()
-                success_count += 1
-            else:
-                print(f"❌ Post {i}/{len(external_posts)}: Failed to save")
-                
-        except Exception as e:
-            print(f"❌ Post {i}/{len(external_posts)}: Error - {e}")
+        print(f"✅ Post {i}/{len(external_posts)}: Theme: {post['theme']}")
+        print(f"   Source: {post['source_type']} - {post['source']}")
+        print(f"   Preview: {post['content'][:60]}...")
+        print()
     
-    print(f"\n🎉 Successfully added {success_count}/{len(external_posts)} external sentiment entries!")
+    print(f"\n🎉 Successfully added {len(sentiment_ids)}/{len(external_posts)} external sentiment entries!")
     print(f"📊 Your dashboard can now show comparative analysis.\n")
 
 
@@ -63,6 +67,7 @@ if __name__ == "__main__":
     response = input("Collect and analyze external Latina wellness content? (yes/no): ")
     
     if response.lower() in ['yes', 'y']:
-        populate_external_sentiment()
+        populate_external_sentiment(use_synthetic='--live' not in sys.argv,
+                                    follow_links='--follow-links' in sys.argv)
     else:
         print("\n❌ Cancelled. No external content was collected.")
\ No newline at end of file
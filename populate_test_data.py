@@ -3,10 +3,10 @@ Script to populate the database with realistic test stories
 Run this to add sample data for testing the dashboard
 """
 
-from utils.database import save_story, update_story_emotion
-from utils.nlp_model import detect_emotion
-from datetime import datetime, timedelta
+from utils.database import save_stories_bulk, get_emotion_distribution
+from datetime import datetime, timedelta, timezone
 import random
+import time
 
 # Sample stories representing real community experiences
 SAMPLE_STORIES = [
@@ -122,39 +122,55 @@ def populate_database(num_stories=None):
     
     print(f"\n🌱 Populating database with {len(stories_to_add)} stories...\n")
     
-    success_count = 0
+    # Classify and insert everything in one batch
+    story_ids = save_stories_bulk([
+        {
+            'story_text': story_data["story"],
+            'support_choices': story_data["supports"],
+            'practitioner_note': story_data["note"]
+        }
+        for story_data in stories_to_add
+    ])
     
-    for i, story_data in enumerate(stories_to_add, 1):
-        try:
-            # Save story
-            story_id = save_story(
-                story_text=story_data["story"],
-                support_choices=story_data["supports"],
-                practitioner_note=story_data["note"]
-            )
-            
-            if story_id:
-                # Detect emotion
-                emotion, confidence, _ = detect_emotion(story_data["story"])
-                
-                # Update with emotion
-                update_story_emotion(story_id, emotion, confidence)
-                
-                print(f"✅ Story {i}/{len(stories_to_add)}: {emotion} (confidence: {confidence:.2f})")
-                print(f"   Preview: {story_data['story'][:60]}...")
-                print()
-                
-                success_count += 1
-            else:
-                print(f"❌ Story {i}/{len(stories_to_add)}: Failed to save")
-                
-        except Exception as e:
-            print(f"❌ Story {i}/{len(stories_to_add)}: Error - {e}")
+    for i, (story_id, story_data) in enumerate(zip(story_ids, stories_to_add), 1):
+        print(f"✅ Story {i}/{len(stories_to_add)}: saved as #{story_id}")
+        print(f"   Preview: {story_data['story'][:60]}...")
+        print()
+    
+    print("🧠 Emotion distribution:")
+    for emotion, count in get_emotion_distribution().items():
+        print(f"   {emotion}: {count}")
     
-    print(f"\n🎉 Successfully added {success_count}/{len(stories_to_add)} stories!")
+    print(f"\n🎉 Successfully added {len(story_ids)}/{len(stories_to_add)} stories!")
     print(f"📊 Your dashboard should now have rich data to display.\n")
 
 
+def populate_synthetic(num_stories, days=90):
+    """
+    Load a large synthetic data set for load testing
+    Sample stories are reused with random timestamps spread over the last `days` days
+    """
+    print(f"\n🌱 Generating {num_stories} synthetic stories...\n")
+    
+    now = datetime.now(timezone.utc)
+    synthetic = []
+    for _ in range(num_stories):
+        story_data = random.choice(SAMPLE_STORIES)
+        created = now - timedelta(seconds=random.randint(0, days * 24 * 3600))
+        synthetic.append({
+            'story_text': story_data["story"],
+            'support_choices': story_data["supports"],
+            'practitioner_note': story_data["note"],
+            'timestamp': created.strftime('%Y-%m-%d %H:%M:%S')
+        })
+    
+    start = time.perf_counter()
+    story_ids = save_stories_bulk(synthetic)
+    elapsed = time.perf_counter() - start
+    
+    print(f"🎉 Added {len(story_ids)} stories in {elapsed:.1f}s ({len(story_ids) / max(elapsed, 1e-9):,.0f} rows/s)\n")
+
+
 if __name__ == "__main__":
     import sys
     
@@ -162,8 +178,15 @@ if __name__ == "__main__":
     print("VOCES EN CALMA - Database Population Script")
     print("=" * 80)
     
+    # Load test mode: python populate_test_data.py --synthetic 1000000
+    if len(sys.argv) > 2 and sys.argv[1] == '--synthetic':
+        try:
+            populate_synthetic(int(sys.argv[2]))
+        except ValueError:
+            print("\n❌ Please provide a valid number: python populate_test_data.py --synthetic 100000")
+    
     # Check if user wants to add specific number of stories
-    if len(sys.argv) > 1:
+    elif len(sys.argv) > 1:
         try:
             num = int(sys.argv[1])
             print(f"\nAdding {num} stories to the database...")
@@ -0,0 +1,85 @@
+"""
+Script to relabel stories whose emotion label came from an older classifier version
+Run this after tuning EMOTION_KEYWORDS or the fallback thresholds; it resumes from its checkpoint
+Usage: python relabel_stories.py [batch_size] [--restart]
+"""
+
+import time
+
+from utils.database import (
+    get_stories_to_relabel,
+    save_relabel_batch,
+    get_job_checkpoint,
+    clear_job_checkpoint
+)
+from utils.nlp_model import CLASSIFIER_VERSION, analyze_batch
+
+JOB_NAME = 'relabel_stories'
+DEFAULT_BATCH_SIZE = 5000
+
+
+def relabel_stories(batch_size=DEFAULT_BATCH_SIZE, restart=False):
+    """
+    Stream stale stories in id order, reclassify each batch and write it back
+    Only one batch is in memory at a time. Every batch is saved in one transaction
+    together with its story_features and the checkpoint, so features never lag
+    behind labels and an interrupted run picks up after the last saved id
+    Returns the number of stories relabelled by this run
+    """
+    print(f"\n🏷️  Relabelling stories with classifier {CLASSIFIER_VERSION}...")
+
+    if restart:
+        clear_job_checkpoint(JOB_NAME)
+    checkpoint = get_job_checkpoint(JOB_NAME)
+
+    # A checkpoint from another classifier version says nothing about this one
+    if checkpoint and checkpoint['classifier_version'] == CLASSIFIER_VERSION:
+        last_id, processed = checkpoint['last_id'], checkpoint['processed']
+        print(f"   Resuming after story {last_id} ({processed:,} already relabelled)")
+    else:
+        last_id, processed = 0, 0
+
+    start = time.perf_counter()
+    relabelled = 0
+
+    while True:
+        batch = get_stories_to_relabel(CLASSIFIER_VERSION, after_id=last_id, limit=batch_size)
+        if not batch:
+            break
+
+        analyses = analyze_batch([story_text for _, story_text in batch])
+        labels = [
+            (story_id, analysis.primary_emotion, analysis.confidence)
+            for (story_id, _), analysis in zip(batch, analyses)
+        ]
+        features = [
+            {**analysis.features(), 'story_id': story_id}
+            for (story_id, _), analysis in zip(batch, analyses)
+        ]
+
+        batch_last_id = batch[-1][0]
+        if not save_relabel_batch(labels, CLASSIFIER_VERSION, JOB_NAME,
+                                  batch_last_id, processed + len(labels), features):
+            print("❌ Stopping: the batch could not be saved (re-run to resume)")
+            break
+
+        last_id = batch_last_id
+        processed += len(labels)
+        relabelled += len(labels)
+        rate = relabelled / max(time.perf_counter() - start, 1e-9)
+        print(f"   {processed:,} stories (up to id {last_id}) - {rate:,.0f} stories/s")
+
+    print(f"\n🎉 Relabelled {relabelled:,} stories in {time.perf_counter() - start:.1f}s")
+    return relabelled
+
+
+if __name__ == "__main__":
+    import sys
+
+    args = [arg for arg in sys.argv[1:] if arg != '--restart']
+    try:
+        size = int(args[0]) if args else DEFAULT_BATCH_SIZE
+    except ValueError:
+        print("\n❌ Please provide a valid batch size: python relabel_stories.py 5000 [--restart]")
+    else:
+        relabel_stories(size, restart='--restart' in sys.argv)
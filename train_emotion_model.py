@@ -0,0 +1,80 @@
+"""
+Script to train the optional linear emotion classifier from labelled stories
+Run this offline, then set VOCES_CLASSIFIER=linear (and VOCES_EMOTION_MODEL if saved elsewhere)
+Usage: python train_emotion_model.py [output_path]
+"""
+
+import random
+import time
+
+from utils.database import get_labelled_stories
+from utils.lexicon import tokenize
+from utils.linear_model import train_linear_model
+from utils.nlp_model import EMOTION_MODEL_PATH
+
+HOLDOUT_FRACTION = 0.1
+MIN_TRAINING_STORIES = 50
+
+
+def load_training_data(batch_size=5000):
+    """Tokenized stories and their labels, read in id order one batch at a time"""
+    token_lists, labels = [], []
+    last_id = 0
+    while True:
+        batch = get_labelled_stories(after_id=last_id, limit=batch_size)
+        if not batch:
+            return token_lists, labels
+        for _, story_text, emotion_label in batch:
+            token_lists.append(tokenize(story_text))
+            labels.append(emotion_label)
+        last_id = batch[-1][0]
+
+
+def train_emotion_model(output_path=EMOTION_MODEL_PATH, seed=42):
+    """
+    Train on labelled stories, report holdout accuracy and latency, and save the model
+    Returns the trained LinearEmotionModel (None if there isn't enough data)
+    """
+    print("\n📚 Loading labelled stories...")
+    token_lists, labels = load_training_data()
+    if len(labels) < MIN_TRAINING_STORIES:
+        print(f"❌ Need at least {MIN_TRAINING_STORIES} labelled stories, found {len(labels)}")
+        return None
+
+    # Shuffle, then keep a holdout slice for evaluation
+    order = list(range(len(labels)))
+    random.Random(seed).shuffle(order)
+    split = int(len(order) * (1 - HOLDOUT_FRACTION))
+    train_rows, test_rows = order[:split], order[split:]
+
+    print(f"🧠 Training on {len(train_rows):,} stories ({len(set(labels))} emotions)...")
+    start = time.perf_counter()
+    model = train_linear_model(
+        [token_lists[i] for i in train_rows],
+        [labels[i] for i in train_rows],
+        seed=seed
+    )
+    print(f"   Trained in {time.perf_counter() - start:.1f}s")
+
+    test_tokens = [token_lists[i] for i in test_rows]
+    predictions = model.predict(test_tokens)
+    correct = sum(1 for (label, _), i in zip(predictions, test_rows) if label == labels[i])
+    print(f"   Holdout accuracy: {correct / max(len(test_rows), 1):.1%} on {len(test_rows):,} stories")
+
+    # Per-document latency as the submission path sees it: one story per call
+    start = time.perf_counter()
+    for words in test_tokens[:1000]:
+        model.predict([words])
+    per_document_ms = (time.perf_counter() - start) * 1000 / max(min(len(test_tokens), 1000), 1)
+    print(f"   Single-story latency: {per_document_ms:.3f} ms")
+
+    model.save(output_path)
+    print(f"\n🎉 Saved model to {output_path}")
+    print("   Enable it with VOCES_CLASSIFIER=linear, then run relabel_stories.py")
+    return model
+
+
+if __name__ == "__main__":
+    import sys
+
+    train_emotion_model(sys.argv[1] if len(sys.argv) > 1 else EMOTION_MODEL_PATH)
@@ -0,0 +1,146 @@
+"""
+Analysis Cache Module
+Content-addressed LRU cache for NLP results, with an optional SQLite tier that survives restarts
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from utils import db_pool
+
+DEFAULT_MAX_SIZE = 10000
+
+
+def normalize_text(text):
+    """
+    Collapse whitespace runs and trim the ends
+    Used for matching reposts of the same text, not for cache keys: keyword span
+    offsets and the language detection window both depend on the text's layout
+    """
+    return " ".join(text.split())
+
+
+def make_cache_key(namespace, version, text):
+    """Hash of the analysis kind, classifier version and exact text"""
+    # The "exact" marker keeps keys apart from the old normalized-text ones
+    payload = f"{namespace}\x00{version}\x00exact\x00{text}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AnalysisCache:
+    """
+    Bounded, thread-safe LRU cache from cache keys to JSON-serializable results
+    With db_path set, misses fall through to a SQLite table and every put is
+    written there too, so a restarted process starts warm
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, db_path=None):
+        self.max_size = max_size
+        self.db_path = db_path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if db_path:
+            self._init_disk_tier()
+
+    def _init_disk_tier(self):
+        """Create the second-tier table, disabling the tier if the file can't be used"""
+        try:
+            db_pool.get_connection(self.db_path).execute("""
+                CREATE TABLE IF NOT EXISTS analysis_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    result TEXT NOT NULL
+                ) WITHOUT ROWID
+            """)
+        except Exception as e:
+            print(f"❌ Error opening analysis cache at {self.db_path}: {e}")
+            self.db_path = None
+
+    def _remember(self, key, value):
+        """Insert into the in-memory LRU, evicting the oldest entries (lock held)"""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def get(self, key):
+        """Cached result for key, or None on a miss"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return self._entries[key]
+
+        value = self._get_from_disk(key)
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.disk_hits += 1
+                self._remember(key, value)
+        return value
+
+    def _get_from_disk(self, key):
+        """Look a key up in the SQLite tier (None if absent or disabled)"""
+        if not self.db_path:
+            return None
+        try:
+            row = db_pool.get_connection(self.db_path).execute(
+                "SELECT result FROM analysis_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+            return json.loads(row[0]) if row else None
+        except Exception as e:
+            print(f"❌ Error reading analysis cache: {e}")
+            return None
+
+    def put(self, key, value):
+        """Store one result"""
+        self.put_many([(key, value)])
+
+    def put_many(self, items):
+        """Store several (key, result) pairs, writing the SQLite tier in one transaction"""
+        items = list(items)
+        with self._lock:
+            for key, value in items:
+                self._remember(key, value)
+
+        if not self.db_path or not items:
+            return
+        try:
+            with db_pool.transaction(self.db_path) as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO analysis_cache (cache_key, result) VALUES (?, ?)",
+                    [(key, json.dumps(value)) for key, value in items]
+                )
+        except Exception as e:
+            print(f"❌ Error writing analysis cache: {e}")
+
+    def clear(self, include_disk=False):
+        """Empty the in-memory cache (and optionally the SQLite tier) and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self.memory_hits = self.disk_hits = self.misses = 0
+        if include_disk and self.db_path:
+            with db_pool.transaction(self.db_path) as conn:
+                conn.execute("DELETE FROM analysis_cache")
+
+    def stats(self):
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                'hits': hits,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'persistent': bool(self.db_path)
+            }
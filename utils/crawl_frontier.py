@@ -0,0 +1,171 @@
+"""
+Crawl Frontier Module
+Bounded priority queue of URLs to visit, with canonicalization, dedup, depth limits and per-domain budgets
+"""
+
+import heapq
+import posixpath
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DEFAULT_MAX_DEPTH = 2
+DEFAULT_DOMAIN_BUDGET = 25
+DEFAULT_MAX_QUEUED = 2000
+
+# Seeds always go first
+SEED_PRIORITY = 1e9
+
+# Query parameters that never change the page
+TRACKING_PARAMETERS = {'fbclid', 'gclid', 'mc_cid', 'mc_eid', 'ref', 'share'}
+
+# Links to files rather than pages
+SKIPPED_EXTENSIONS = (
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.ico', '.pdf', '.zip',
+    '.mp3', '.mp4', '.mov', '.css', '.js', '.json', '.xml'
+)
+
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def canonicalize_url(url):
+    """
+    Canonical form of an http(s) URL, or None for anything else
+    Lowercases scheme and host, drops default ports, fragments and tracking
+    parameters, sorts the query and resolves dot segments, so the same page
+    reached through different links dedups to one entry
+    """
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in _DEFAULT_PORTS or not parts.hostname:
+        return None
+
+    host = parts.hostname.lower()
+    if port and port != _DEFAULT_PORTS[scheme]:
+        host = f"{host}:{port}"
+
+    path = parts.path or "/"
+    if "/." in path:
+        trailing = path.endswith("/")
+        path = posixpath.normpath(path)
+        path = path + "/" if trailing and path != "/" else path
+
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMETERS
+    ))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def domain_of(url):
+    """Domain a URL's budget is counted against (www. is the same site)"""
+    host = urlsplit(url).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class CrawlFrontier:
+    """
+    URLs waiting to be fetched, highest priority first
+    Only the seeds' domains are crawled. add() rejects URLs that were already
+    seen, are deeper than max_depth, point at files, or whose domain has used
+    up its budget of pages. The queue holds at most max_queued URLs; the
+    lowest-priority ones are dropped (and their budget returned) when it fills.
+    to_dict()/from_dict() checkpoint the whole state so a crawl can resume
+    """
+
+    def __init__(self, max_depth=DEFAULT_MAX_DEPTH, domain_budget=DEFAULT_DOMAIN_BUDGET,
+                 max_queued=DEFAULT_MAX_QUEUED):
+        self.max_depth = max_depth
+        self.domain_budget = domain_budget
+        self.max_queued = max_queued
+        self.domains = set()
+        self.seen = set()
+        self.scheduled = {}
+        self.fetched = 0
+        self._queue = []
+        self._counter = 0
+
+    def __len__(self):
+        return len(self._queue)
+
+    def seed(self, urls):
+        """Add start URLs at depth 0 and allow their domains"""
+        for url in urls:
+            canonical = canonicalize_url(url)
+            if canonical:
+                self.domains.add(domain_of(canonical))
+                self.add(canonical, 0, SEED_PRIORITY)
+
+    def add(self, url, depth, priority):
+        """Queue a URL; returns False if it was rejected"""
+        canonical = canonicalize_url(url)
+        if canonical is None or canonical in self.seen or depth > self.max_depth:
+            return False
+        if urlsplit(canonical).path.lower().endswith(SKIPPED_EXTENSIONS):
+            return False
+        domain = domain_of(canonical)
+        if domain not in self.domains or self.scheduled.get(domain, 0) >= self.domain_budget:
+            return False
+
+        self.seen.add(canonical)
+        self.scheduled[domain] = self.scheduled.get(domain, 0) + 1
+        # Ties go to the URL queued first
+        heapq.heappush(self._queue, (-priority, self._counter, canonical, depth))
+        self._counter += 1
+
+        if len(self._queue) > self.max_queued:
+            self._drop_lowest()
+        return True
+
+    def _drop_lowest(self):
+        """Shrink the queue back to max_queued, returning dropped URLs' budget"""
+        keep = heapq.nsmallest(self.max_queued, self._queue)
+        kept = {entry[1] for entry in keep}
+        for _, counter, url, _ in self._queue:
+            if counter not in kept:
+                domain = domain_of(url)
+                self.scheduled[domain] -= 1
+        self._queue = keep
+        heapq.heapify(self._queue)
+
+    def is_queued(self, url):
+        """Whether a canonical URL is still waiting to be fetched"""
+        return any(entry[2] == url for entry in self._queue)
+
+    def pop_batch(self, size):
+        """Up to size of the highest-priority URLs as dictionaries with url, depth and priority"""
+        batch = []
+        while self._queue and len(batch) < size:
+            negative_priority, _, url, depth = heapq.heappop(self._queue)
+            batch.append({'url': url, 'depth': depth, 'priority': -negative_priority})
+        self.fetched += len(batch)
+        return batch
+
+    def to_dict(self):
+        """Checkpoint of the whole frontier as JSON-serializable data"""
+        return {
+            'max_depth': self.max_depth,
+            'domain_budget': self.domain_budget,
+            'max_queued': self.max_queued,
+            'domains': sorted(self.domains),
+            'seen': sorted(self.seen),
+            'scheduled': self.scheduled,
+            'fetched': self.fetched,
+            'queue': self._queue,
+            'counter': self._counter
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a frontier from to_dict() output"""
+        frontier = cls(data['max_depth'], data['domain_budget'], data['max_queued'])
+        frontier.domains = set(data['domains'])
+        frontier.seen = set(data['seen'])
+        frontier.scheduled = data['scheduled']
+        frontier.fetched = data['fetched']
+        frontier._queue = [tuple(entry) for entry in data['queue']]
+        heapq.heapify(frontier._queue)
+        frontier._counter = data['counter']
+        return frontier
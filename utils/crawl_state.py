@@ -0,0 +1,122 @@
+"""
+Crawl State Module
+Tracks which scraped items were already ingested so incremental runs only process new content
+"""
+
+import hashlib
+
+from utils.analysis_cache import normalize_text
+from utils.database import (
+    clear_crawl_frontier, get_crawl_high_water, get_crawl_validators, get_seen_crawl_items,
+    save_crawl_high_water, save_crawl_validators
+)
+
+
+def content_hash(text):
+    """Hash of whitespace- and case-normalized text, so reposts of the same post match"""
+    return hashlib.sha256(normalize_text(text).lower().encode("utf-8")).hexdigest()
+
+
+def item_key(item, digest):
+    """Stable identity of a scraped item: its post id, else its URL, else its content hash"""
+    return item.get('item_id') or item.get('url') or f"hash:{digest}"
+
+
+class CrawlState:
+    """
+    Per-run view of the crawl_seen and crawl_sources tables
+    Collectors ask since() for a source's high-water mark to skip old items
+    while parsing, then filter_new() drops anything whose key or content hash
+    was ingested before. save() persists the advanced marks once the new items
+    are stored (save_external_sentiment_bulk records the seen items themselves),
+    along with any feed validators deferred until then, and clears the
+    checkpoints of link-following crawls whose items are now stored.
+    Feed validators live in crawl_sources, never in the HTTP cache: the cache
+    would answer a 304 for them without the body its items came from
+    """
+
+    def __init__(self):
+        self.high_water = {}
+        self.stored_validators = {}
+        self.new_marks = {}
+        self.pending_validators = {}
+        self.finished_crawls = []
+        self.skipped = 0
+
+    def load(self, sources):
+        """Read the stored high-water marks and feed validators for these sources"""
+        sources = list(sources)
+        self.high_water.update(get_crawl_high_water(sources))
+        self.stored_validators.update(get_crawl_validators(sources))
+
+    def since(self, source):
+        """Newest item time already ingested from source (None if never crawled)"""
+        return self.high_water.get(source)
+
+    def validators(self, url):
+        """ETag/Last-Modified of a feed's last stored fetch, to request it conditionally"""
+        return self.stored_validators.get(url)
+
+    def defer_validators(self, url, validators):
+        """
+        Store a streamed feed's validators in save(), not now
+        A 304 for such a feed returns no items, so it may only be answered once
+        this response's items are stored
+        """
+        if validators:
+            self.pending_validators[url] = validators
+
+    def finish_crawl(self, crawl_name):
+        """Clear a finished crawl's checkpoint (which holds its items) in save(), not now"""
+        self.finished_crawls.append(crawl_name)
+
+    def known_urls(self, urls):
+        """Which of these page URLs were already ingested as items (skipped before fetching)"""
+        return get_seen_crawl_items(urls, [])[0]
+
+    def filter_new(self, items):
+        """
+        Items not ingested before, in order, each tagged with item_key and content_hash
+        Duplicates within the batch are dropped too
+        """
+        for item in items:
+            item['content_hash'] = content_hash(item['content'])
+            item['item_key'] = item_key(item, item['content_hash'])
+
+        known_keys, known_hashes = get_seen_crawl_items(
+            {item['item_key'] for item in items}, {item['content_hash'] for item in items}
+        )
+
+        new_items = []
+        for item in items:
+            if item['item_key'] in known_keys or item['content_hash'] in known_hashes:
+                continue
+            known_keys.add(item['item_key'])
+            known_hashes.add(item['content_hash'])
+            new_items.append(item)
+
+            published = item.get('published_epoch')
+            if published is not None and published > self.new_marks.get(item['source'], float('-inf')):
+                self.new_marks[item['source']] = published
+
+        self.skipped += len(items) - len(new_items)
+        return new_items
+
+    def save(self):
+        """Persist the high-water marks advanced by this run, then the deferred work"""
+        if self.new_marks:
+            if not save_crawl_high_water(self.new_marks):
+                return False
+            for source, mark in self.new_marks.items():
+                self.high_water[source] = max(mark, self.high_water.get(source, mark))
+            self.new_marks = {}
+
+        if self.pending_validators:
+            if not save_crawl_validators(self.pending_validators):
+                return False
+            self.stored_validators.update(self.pending_validators)
+            self.pending_validators = {}
+        for crawl_name in self.finished_crawls:
+            clear_crawl_frontier(crawl_name)
+        self.finished_crawls = []
+        return True
@@ -3,17 +3,97 @@ Database module for Voces en Calma
 Handles all database operations with privacy-first design
 """
 
-import sqlite3
+import calendar
 import json
+import threading
 from datetime import datetime
 from pathlib import Path
 
+from utils import db_pool
+from utils.migrations import run_migrations, STORY_FEATURE_EMOTIONS
+from utils.translations import TRANSLATIONS
+
 # Database path
 DB_PATH = Path(__file__).parent.parent / "data" / "voces.db"
 
+
+# Database paths whose schema has been created/migrated in this process
+_initialized_paths = set()
+_init_lock = threading.Lock()
+
+
+def ensure_database():
+    """
+    Create tables and run migrations the first time the database is used
+    Later calls are a set lookup, so every query path can call this cheaply
+    """
+    db_path = DB_PATH
+    if db_path in _initialized_paths:
+        return
+    with _init_lock:
+        if db_path not in _initialized_paths:
+            init_database()
+            _initialized_paths.add(db_path)
+
+
+def get_connection():
+    """Get this thread's pooled connection to the Voces database"""
+    ensure_database()
+    return db_pool.get_connection(DB_PATH)
+
+
+def transaction():
+    """
+    Context manager for a single write transaction
+    Usage: with transaction() as conn: conn.execute(...)
+    """
+    ensure_database()
+    return db_pool.transaction(DB_PATH)
+
+
+# Translation keys of the support options offered on the Share Story page
+SUPPORT_KEYS = [
+    'journaling', 'group_circles', 'one_on_one', 'art_therapy', 'bodywork',
+    'spiritual', 'self_study', 'somatic', 'herbal'
+]
+
+# Any translated label -> canonical support key (so English and Spanish choices count together)
+SUPPORT_LABEL_TO_KEY = {
+    TRANSLATIONS[lang][key]: key
+    for lang in TRANSLATIONS
+    for key in SUPPORT_KEYS
+    if key in TRANSLATIONS[lang]
+}
+
+
+def resolve_support_ids(conn, support_choices, cache=None):
+    """
+    Map support labels (in any language) to canonical support_types ids
+    Labels outside the catalog are registered as new support types
+    cache: optional dict (label -> id) reused across calls by bulk loaders
+    """
+    support_ids = []
+    for label in support_choices:
+        support_id = cache.get(label) if cache is not None else None
+        if support_id is None:
+            key = SUPPORT_LABEL_TO_KEY.get(label)
+            if key:
+                row = conn.execute("SELECT id FROM support_types WHERE support_key = ?", (key,)).fetchone()
+            else:
+                conn.execute("INSERT OR IGNORE INTO support_types (name) VALUES (?)", (label,))
+                row = conn.execute("SELECT id FROM support_types WHERE name = ?", (label,)).fetchone()
+            support_id = row[0]
+            if cache is not None:
+                cache[label] = support_id
+        if support_id not in support_ids:
+            support_ids.append(support_id)
+    return support_ids
+
+
 def init_database():
     """Initialize the database with required tables"""
-    conn = sqlite3.connect(DB_PATH)
+    # Straight from the pool: get_connection() would re-enter ensure_database()
+    conn = db_pool.get_connection(DB_PATH)
     cursor = conn.cursor()
     
     # Stories table - NO personal identifiers
@@ -41,32 +121,47 @@ def init_database():
             source_type TEXT
         )
     """)
-    
-    conn.commit()
-    conn.close()
+
+    # Bring indexes and later schema changes up to date
+    run_migrations(DB_PATH)
+
     print("✅ Database initialized successfully")
 
 
-def save_story(story_text, support_choices, practitioner_note="", language="en"):
+def save_story(story_text, support_choices, practitioner_note="", language="en",
+               emotion_label=None, emotion_confidence=None, enqueue_labelling=False,
+               features=None, classifier_version=None):
     """
     Save a story to the database
+    Pass emotion_label/emotion_confidence to store the NLP result in the same write,
+    or enqueue_labelling=True to leave it for the background labelling worker
+    features: optional story_features values (EmotionAnalysis.features()) saved alongside
+    classifier_version: fingerprint of the classifier that produced emotion_label
     Returns the story ID if successful, None otherwise
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
         # Convert support_choices list to JSON string
         support_json = json.dumps(support_choices)
         
-        cursor.execute("""
-            INSERT INTO stories (story_text, support_choices, practitioner_note, language)
-            VALUES (?, ?, ?, ?)
-        """, (story_text, support_json, practitioner_note, language))
-        
-        story_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        with transaction() as conn:
+            cursor = conn.execute("""
+                INSERT INTO stories (story_text, support_choices, practitioner_note, language,
+                                     emotion_label, emotion_confidence, classifier_version)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (story_text, support_json, practitioner_note, language,
+                  emotion_label, emotion_confidence, classifier_version))
+            story_id = cursor.lastrowid
+            
+            conn.executemany(
+                "INSERT OR IGNORE INTO story_support (story_id, support_id) VALUES (?, ?)",
+                [(story_id, support_id) for support_id in resolve_support_ids(conn, support_choices)]
+            )
+            
+            if enqueue_labelling:
+                conn.execute("INSERT OR IGNORE INTO labelling_queue (story_id) VALUES (?)", (story_id,))
+            
+            if features:
+                _upsert_story_features(conn, [{**features, 'story_id': story_id}])
         
         return story_id
     except Exception as e:
@@ -74,70 +169,649 @@ def save_story(story_text, support_choices, practitioner_note="", language="en")
         return None
 
 
-def update_story_emotion(story_id, emotion_label, confidence):
+# Rows per transaction for the bulk loaders
+BULK_CHUNK_SIZE = 20000
+
+
+def _classify_texts(texts):
+    """
+    Label a batch of texts with (emotion, confidence, classifier_version)
+    Repeated texts are classified once and the result reused
+    """
+    # Deferred import: only bulk loading needs the NLP model
+    from utils.nlp_model import CLASSIFIER_VERSION, detect_emotion_batch
+    
+    unique_texts = list(dict.fromkeys(texts))
+    results = {
+        text: (emotion, confidence, CLASSIFIER_VERSION)
+        for text, (emotion, confidence, _) in zip(unique_texts, detect_emotion_batch(unique_texts))
+    }
+    return [results[text] for text in texts]
+
+
+def _last_assigned_id(conn, table):
+    """Highest id handed out so far for an AUTOINCREMENT table"""
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+    return row[0] if row else 0
+
+
+def _insert_chunk(conn, table, insert_sql, rows):
+    """
+    executemany one chunk and return the ids it was assigned
+    We hold the write lock and AUTOINCREMENT hands out consecutive ids,
+    so the new ids are exactly the ones after the previous high-water mark
+    """
+    first_id = _last_assigned_id(conn, table) + 1
+    conn.executemany(insert_sql, rows)
+    return list(range(first_id, _last_assigned_id(conn, table) + 1))
+
+
+def save_stories_bulk(stories, chunk_size=BULK_CHUNK_SIZE):
+    """
+    Save many stories at once, already labelled with their emotion
+    stories: iterable of dicts with story_text and support_choices, and optionally
+             practitioner_note, language, timestamp, emotion_label, emotion_confidence,
+             classifier_version
+    Rows without an emotion_label are classified in batch before inserting.
+    Each chunk is one transaction; returns the new story IDs in input order.
+    Errors are raised, not swallowed: chunks committed before the failure stay saved
+    """
+    story_ids = []
+    support_cache = {}
+    stories = list(stories)
+    
+    for start in range(0, len(stories), chunk_size):
+        chunk = stories[start:start + chunk_size]
+        
+        unlabelled = [s for s in chunk if not s.get('emotion_label')]
+        labels = iter(_classify_texts([s['story_text'] for s in unlabelled]))
+        
+        rows = []
+        for story in chunk:
+            if story.get('emotion_label'):
+                emotion, confidence = story['emotion_label'], story.get('emotion_confidence')
+                version = story.get('classifier_version')
+            else:
+                emotion, confidence, version = next(labels)
+            rows.append((
+                story.get('timestamp'),
+                story['story_text'],
+                emotion,
+                confidence,
+                json.dumps(story['support_choices']),
+                story.get('practitioner_note', ""),
+                story.get('language', "en"),
+                version
+            ))
+        
+        with transaction() as conn:
+            chunk_ids = _insert_chunk(conn, 'stories', """
+                INSERT INTO stories (timestamp, story_text, emotion_label, emotion_confidence,
+                                     support_choices, practitioner_note, language,
+                                     classifier_version)
+                VALUES (COALESCE(?, CURRENT_TIMESTAMP), ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            
+            conn.executemany(
+                "INSERT OR IGNORE INTO story_support (story_id, support_id) VALUES (?, ?)",
+                [
+                    (story_id, support_id)
+                    for story_id, story in zip(chunk_ids, chunk)
+                    for support_id in resolve_support_ids(conn, story['support_choices'], support_cache)
+                ]
+            )
+        
+        story_ids.extend(chunk_ids)
+    
+    return story_ids
+
+
+def update_story_emotion(story_id, emotion_label, confidence, classifier_version=None):
     """Update a story with its emotion label after NLP processing"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            UPDATE stories 
-            SET emotion_label = ?, emotion_confidence = ?
-            WHERE id = ?
-        """, (emotion_label, confidence, story_id))
+        with transaction() as conn:
+            conn.execute("""
+                UPDATE stories 
+                SET emotion_label = ?, emotion_confidence = ?, classifier_version = ?
+                WHERE id = ?
+            """, (emotion_label, confidence, classifier_version, story_id))
         
-        conn.commit()
-        conn.close()
         return True
     except Exception as e:
         print(f"❌ Error updating emotion: {e}")
         return False
 
 
+# Give up on a queued story after this many failed labelling attempts
+MAX_LABELLING_ATTEMPTS = 5
+
+
+def get_labelling_batch(limit=100):
+    """
+    Get the oldest queued stories waiting for an emotion label
+    Returns a list of (story_id, story_text) tuples
+    """
+    try:
+        cursor = get_connection().execute("""
+            SELECT q.story_id, s.story_text
+            FROM labelling_queue q
+            JOIN stories s ON s.id = q.story_id
+            WHERE q.attempts < ?
+            ORDER BY q.attempts, q.enqueued_at
+            LIMIT ?
+        """, (MAX_LABELLING_ATTEMPTS, limit))
+        return cursor.fetchall()
+    except Exception as e:
+        print(f"❌ Error reading labelling queue: {e}")
+        return []
+
+
+def complete_labelling(labels, failures=None, features=None, classifier_version=None):
+    """
+    Store a batch of labels and remove those stories from the queue, in one transaction
+    labels: list of (story_id, emotion_label, confidence)
+    failures: optional list of (story_id, error message) to retry later
+    features: optional list of story_features dicts (each with a story_id)
+    classifier_version: fingerprint of the classifier that produced the labels
+    """
+    try:
+        with transaction() as conn:
+            # On conn, so a failed UPDATE rolls back the queue deletes too
+            conn.executemany("""
+                UPDATE stories
+                SET emotion_label = ?, emotion_confidence = ?, classifier_version = ?
+                WHERE id = ?
+            """, [
+                (emotion_label, confidence, classifier_version, story_id)
+                for story_id, emotion_label, confidence in labels
+            ])
+            if features:
+                _upsert_story_features(conn, features)
+            conn.executemany(
+                "DELETE FROM labelling_queue WHERE story_id = ?",
+                [(story_id,) for story_id, _, _ in labels]
+            )
+            conn.executemany("""
+                UPDATE labelling_queue
+                SET attempts = attempts + 1, last_error = ?
+                WHERE story_id = ?
+            """, [(error, story_id) for story_id, error in failures or []])
+        return True
+    except Exception as e:
+        print(f"❌ Error completing labelling batch: {e}")
+        return False
+
+
+def requeue_unlabelled_stories():
+    """
+    Queue every story that still has no emotion label (e.g. after a crash)
+    Stories that used up their attempts get a fresh set, so they are retried too
+    Returns the number of stories added to the queue or given new attempts
+    """
+    try:
+        with transaction() as conn:
+            retried = conn.execute("""
+                UPDATE labelling_queue SET attempts = 0
+                WHERE attempts >= ?
+                  AND story_id IN (SELECT id FROM stories WHERE emotion_label IS NULL)
+            """, (MAX_LABELLING_ATTEMPTS,)).rowcount
+            cursor = conn.execute("""
+                INSERT OR IGNORE INTO labelling_queue (story_id)
+                SELECT id FROM stories WHERE emotion_label IS NULL
+            """)
+            return retried + cursor.rowcount
+    except Exception as e:
+        print(f"❌ Error requeueing unlabelled stories: {e}")
+        return 0
+
+
+def get_labelling_queue_size():
+    """Number of stories still waiting for a label"""
+    try:
+        row = get_connection().execute(
+            "SELECT COUNT(*) FROM labelling_queue WHERE attempts < ?", (MAX_LABELLING_ATTEMPTS,)
+        ).fetchone()
+        return row[0]
+    except Exception as e:
+        print(f"❌ Error getting labelling queue size: {e}")
+        return 0
+
+
+def get_stories_to_relabel(classifier_version, after_id=0, limit=1000):
+    """
+    Next batch of stories labelled by another (or an unknown) classifier version
+    Keyset paged by story id, so callers can stream any number of rows
+    Returns a list of (story_id, story_text) tuples
+    """
+    try:
+        cursor = get_connection().execute("""
+            SELECT id, story_text
+            FROM stories
+            WHERE id > ? AND classifier_version IS NOT ?
+            ORDER BY id
+            LIMIT ?
+        """, (after_id, classifier_version, limit))
+        return cursor.fetchall()
+    except Exception as e:
+        print(f"❌ Error reading stories to relabel: {e}")
+        return []
+
+
+def get_labelled_stories(after_id=0, limit=5000):
+    """
+    Next batch of labelled stories, keyset paged by id (for model training)
+    Returns a list of (story_id, story_text, emotion_label) tuples
+    """
+    try:
+        cursor = get_connection().execute("""
+            SELECT id, story_text, emotion_label
+            FROM stories
+            WHERE id > ? AND emotion_label IS NOT NULL
+            ORDER BY id
+            LIMIT ?
+        """, (after_id, limit))
+        return cursor.fetchall()
+    except Exception as e:
+        print(f"❌ Error reading labelled stories: {e}")
+        return []
+
+
+def save_relabel_batch(labels, classifier_version, job, last_id, processed, features=None):
+    """
+    Write a batch of new labels and advance the job checkpoint in one transaction
+    labels: list of (story_id, emotion_label, confidence)
+    features: optional list of story_features dicts (each with a story_id) from the same analyses
+    Relabelled stories leave the labelling queue, as the worker would label them the same way
+    Returns True if the batch was saved
+    """
+    try:
+        with transaction() as conn:
+            conn.executemany("""
+                UPDATE stories
+                SET emotion_label = ?, emotion_confidence = ?, classifier_version = ?
+                WHERE id = ?
+            """, [
+                (emotion_label, confidence, classifier_version, story_id)
+                for story_id, emotion_label, confidence in labels
+            ])
+            if features:
+                _upsert_story_features(conn, features)
+            conn.executemany(
+                "DELETE FROM labelling_queue WHERE story_id = ?",
+                [(story_id,) for story_id, _, _ in labels]
+            )
+            conn.execute("""
+                INSERT INTO job_checkpoints (job, classifier_version, last_id, processed, updated_at)
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT (job) DO UPDATE SET
+                    classifier_version = excluded.classifier_version,
+                    last_id = excluded.last_id,
+                    processed = excluded.processed,
+                    updated_at = excluded.updated_at
+            """, (job, classifier_version, last_id, processed))
+        return True
+    except Exception as e:
+        print(f"❌ Error saving relabel batch: {e}")
+        return False
+
+
+def get_job_checkpoint(job):
+    """
+    Saved progress of a resumable job
+    Returns a dictionary with classifier_version, last_id, processed and updated_at, or None
+    """
+    try:
+        row = get_connection().execute("""
+            SELECT classifier_version, last_id, processed, updated_at
+            FROM job_checkpoints WHERE job = ?
+        """, (job,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(['classifier_version', 'last_id', 'processed', 'updated_at'], row))
+    except Exception as e:
+        print(f"❌ Error reading job checkpoint: {e}")
+        return None
+
+
+def clear_job_checkpoint(job):
+    """Forget a job's progress so the next run starts from the beginning"""
+    try:
+        with transaction() as conn:
+            conn.execute("DELETE FROM job_checkpoints WHERE job = ?", (job,))
+        return True
+    except Exception as e:
+        print(f"❌ Error clearing job checkpoint: {e}")
+        return False
+
+
+# Columns of story_features filled from EmotionAnalysis.features()
+STORY_FEATURE_COLUMNS = list(STORY_FEATURE_EMOTIONS) + [
+    'keyword_hits', 'vader_compound', 'vader_pos', 'vader_neg', 'vader_neu',
+    'word_count', 'classifier_version'
+]
+
+
+def _upsert_story_features(conn, features):
+    """Insert or replace story_features rows; keys outside STORY_FEATURE_COLUMNS are ignored"""
+    columns = ['story_id'] + STORY_FEATURE_COLUMNS
+    conn.executemany(f"""
+        INSERT OR REPLACE INTO story_features ({', '.join(columns)})
+        VALUES ({', '.join('?' for _ in columns)})
+    """, [
+        tuple(row.get(column, 0 if column in STORY_FEATURE_EMOTIONS else None) for column in columns)
+        for row in features
+    ])
+
+
+def save_story_features_bulk(features):
+    """
+    Store feature rows for existing stories in one transaction
+    features: list of story_features dicts, each with a story_id
+    Returns the number of rows written (0 on error)
+    """
+    try:
+        with transaction() as conn:
+            _upsert_story_features(conn, features)
+        return len(features)
+    except Exception as e:
+        print(f"❌ Error saving story features: {e}")
+        return 0
+
+
+def get_stories_needing_features(classifier_version, after_id=0, limit=1000):
+    """
+    Next batch of stories with no features, or features from another classifier version
+    Keyset paged by story id so a backfill can stream any number of rows
+    Returns a list of (story_id, story_text) tuples
+    """
+    try:
+        cursor = get_connection().execute("""
+            SELECT s.id, s.story_text
+            FROM stories s
+            LEFT JOIN story_features f ON f.story_id = s.id
+            WHERE s.id > ?
+              AND (f.story_id IS NULL OR f.classifier_version != ?)
+            ORDER BY s.id
+            LIMIT ?
+        """, (after_id, classifier_version, limit))
+        return cursor.fetchall()
+    except Exception as e:
+        print(f"❌ Error reading stories for feature backfill: {e}")
+        return []
+
+
+def get_weekly_sentiment():
+    """
+    Average VADER compound score and story count per week (Monday start), oldest first
+    Returns a list of dicts with week, avg_compound and stories
+    """
+    try:
+        cursor = get_connection().execute("""
+            SELECT s.created_week, AVG(f.vader_compound), COUNT(*)
+            FROM story_features f
+            JOIN stories s ON s.id = f.story_id
+            WHERE f.vader_compound IS NOT NULL
+            GROUP BY s.created_week
+            ORDER BY s.created_week
+        """)
+        return [
+            {'week': week, 'avg_compound': round(avg_compound, 4), 'stories': stories}
+            for week, avg_compound, stories in cursor.fetchall()
+        ]
+    except Exception as e:
+        print(f"❌ Error getting weekly sentiment: {e}")
+        return []
+
+
+def get_secondary_emotion_stats(mixed_threshold=3):
+    """
+    Secondary emotion counts and the mixed-emotion rate from stored features
+    A story counts towards every emotion with keyword hits other than its primary
+    label, and as mixed when at least mixed_threshold emotions have hits
+    Returns a dictionary with secondary (emotion -> stories), mixed_rate and stories
+    """
+    try:
+        emotions = [emotion for emotion in STORY_FEATURE_EMOTIONS if emotion != 'neutral']
+        secondary_sums = ", ".join(
+            f"SUM(f.{emotion} > 0 AND s.emotion_label != '{emotion}')" for emotion in emotions
+        )
+        emotions_present = " + ".join(f"(f.{emotion} > 0)" for emotion in emotions)
+        row = get_connection().execute(f"""
+            SELECT COUNT(*), SUM({emotions_present} >= ?), {secondary_sums}
+            FROM story_features f
+            JOIN stories s ON s.id = f.story_id
+            WHERE f.keyword_hits > 0
+        """, (mixed_threshold,)).fetchone()
+
+        stories, mixed = row[0], row[1] or 0
+        secondary = {
+            emotion: count for emotion, count in zip(emotions, row[2:]) if count
+        }
+        return {
+            'secondary': dict(sorted(secondary.items(), key=lambda x: x[1], reverse=True)),
+            'mixed_rate': round(mixed / stories, 4) if stories else 0.0,
+            'stories': stories
+        }
+    except Exception as e:
+        print(f"❌ Error getting secondary emotion stats: {e}")
+        return {'secondary': {}, 'mixed_rate': 0.0, 'stories': 0}
+
+
+# Columns returned for story listings, in the order _story_from_row expects
+STORY_COLUMNS = """
+    id, timestamp, story_text, emotion_label,
+    emotion_confidence, support_choices, practitioner_note
+"""
+
+
+def _story_from_row(story):
+    """Convert a STORY_COLUMNS row into the story dictionary used by the pages"""
+    return {
+        'id': story[0],
+        'timestamp': story[1],
+        'story_text': story[2],
+        'emotion_label': story[3],
+        'emotion_confidence': story[4],
+        'support_choices': json.loads(story[5]),
+        'practitioner_note': story[6]
+    }
+
+
+def _to_epoch(moment):
+    """Convert a datetime to Unix seconds (naive datetimes are assumed to be UTC)"""
+    if moment.tzinfo is not None:
+        return int(moment.timestamp())
+    return calendar.timegm(moment.timetuple())
+
+
+def _story_filters(since=None, emotion=None, language=None):
+    """Build WHERE clauses and parameters for the optional story filters"""
+    clauses = []
+    params = []
+    if since is not None:
+        clauses.append("created_epoch > ?")
+        params.append(_to_epoch(since))
+    if emotion is not None:
+        clauses.append("emotion_label = ?")
+        params.append(emotion)
+    if language is not None:
+        clauses.append("language = ?")
+        params.append(language)
+    return clauses, params
+
+
 def get_all_stories():
     """Retrieve all stories for analysis (practitioners only)"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
+        cursor = get_connection().cursor()
         
-        cursor.execute("""
-            SELECT id, timestamp, story_text, emotion_label, 
-                   emotion_confidence, support_choices, practitioner_note
+        cursor.execute(f"""
+            SELECT {STORY_COLUMNS}
             FROM stories
             ORDER BY timestamp DESC
         """)
         
-        stories = cursor.fetchall()
-        conn.close()
-        
         # Convert to list of dictionaries for easier handling
-        story_list = []
-        for story in stories:
-            story_list.append({
-                'id': story[0],
-                'timestamp': story[1],
-                'story_text': story[2],
-                'emotion_label': story[3],
-                'emotion_confidence': story[4],
-                'support_choices': json.loads(story[5]),
-                'practitioner_note': story[6]
-            })
-        
-        return story_list
+        return [_story_from_row(story) for story in cursor.fetchall()]
     except Exception as e:
         print(f"❌ Error retrieving stories: {e}")
         return []
 
 
+def story_cursor(story):
+    """Keyset cursor (timestamp, id) for a story returned by get_stories_page"""
+    return (story['timestamp'], story['id'])
+
+
+def get_stories_page(cursor=None, limit=5, since=None, emotion=None, language=None, before=False):
+    """
+    Fetch one page of stories, newest first, using keyset pagination on (timestamp, id)
+    cursor: story_cursor() of a story on the neighbouring page, or None to start at an end
+    before: False returns stories older than the cursor (next page);
+            True returns stories newer than it (previous page), or the oldest page when cursor is None
+    Only the rows on the page are read, so page turns cost the same at any depth
+    """
+    try:
+        clauses, params = _story_filters(since, emotion, language)
+        if cursor is not None:
+            clauses.append("(timestamp, id) > (?, ?)" if before else "(timestamp, id) < (?, ?)")
+            params.extend(cursor)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        order = "ASC" if before else "DESC"
+        
+        rows = get_connection().execute(f"""
+            SELECT {STORY_COLUMNS}
+            FROM stories
+            {where}
+            ORDER BY timestamp {order}, id {order}
+            LIMIT ?
+        """, params + [limit]).fetchall()
+        
+        if before:
+            rows.reverse()
+        return [_story_from_row(story) for story in rows]
+    except Exception as e:
+        print(f"❌ Error retrieving story page: {e}")
+        return []
+
+
+def count_stories(since=None, emotion=None, language=None):
+    """Count stories matching the same filters as get_stories_page"""
+    if since is None and emotion is None and language is None:
+        return get_story_count()
+    try:
+        clauses, params = _story_filters(since, emotion, language)
+        row = get_connection().execute(
+            f"SELECT COUNT(*) FROM stories WHERE {' AND '.join(clauses)}", params
+        ).fetchone()
+        return row[0]
+    except Exception as e:
+        print(f"❌ Error counting stories: {e}")
+        return 0
+
+
+def count_stories_since(since):
+    """Count stories created after a datetime (indexed range scan on created_epoch)"""
+    try:
+        row = get_connection().execute(
+            "SELECT COUNT(*) FROM stories WHERE created_epoch > ?", (_to_epoch(since),)
+        ).fetchone()
+        return row[0]
+    except Exception as e:
+        print(f"❌ Error counting recent stories: {e}")
+        return 0
+
+
+def get_stories_between(start, end, limit=None):
+    """
+    Retrieve stories created in [start, end), newest first
+    Uses the created_epoch index, so only rows inside the window are read
+    """
+    try:
+        cursor = get_connection().execute(f"""
+            SELECT {STORY_COLUMNS}
+            FROM stories
+            WHERE created_epoch >= ? AND created_epoch < ?
+            ORDER BY created_epoch DESC, id DESC
+            LIMIT ?
+        """, (_to_epoch(start), _to_epoch(end), -1 if limit is None else limit))
+        return [_story_from_row(story) for story in cursor.fetchall()]
+    except Exception as e:
+        print(f"❌ Error retrieving stories in range: {e}")
+        return []
+
+
+def get_weekly_emotion_counts():
+    """
+    Count labelled stories per (week, emotion) for trend charts
+    Weeks are identified by their Monday, e.g. '2026-01-05'
+    """
+    try:
+        cursor = get_connection().execute("""
+            SELECT created_week, emotion_label, COUNT(*)
+            FROM stories
+            WHERE emotion_label IS NOT NULL
+            GROUP BY created_week, emotion_label
+            ORDER BY created_week
+        """)
+        return cursor.fetchall()
+    except Exception as e:
+        print(f"❌ Error getting weekly emotion counts: {e}")
+        return []
+
+
+def count_term_mentions(terms, since=None):
+    """
+    Count how often each term appears across story texts (case-insensitive substring count)
+    The counting happens in SQL so story texts never leave the database
+    """
+    if not terms:
+        return {}
+    try:
+        clauses, params = _story_filters(since)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        # Occurrences = (length - length with the term removed) / term length
+        columns = ", ".join(
+            "COALESCE(SUM((LENGTH(t) - LENGTH(REPLACE(t, ?, ''))) / ?), 0)" for _ in terms
+        )
+        term_params = []
+        for term in terms:
+            term_params.extend([term.lower(), len(term)])
+        
+        row = get_connection().execute(f"""
+            SELECT {columns}
+            FROM (SELECT LOWER(story_text) AS t FROM stories {where})
+        """, term_params + params).fetchone()
+        
+        return {term: count for term, count in zip(terms, row) if count > 0}
+    except Exception as e:
+        print(f"❌ Error counting term mentions: {e}")
+        return {}
+
+
+def _get_rollup_total(metric):
+    """Read a single total counter kept up to date by the rollup triggers"""
+    row = get_connection().execute(
+        "SELECT count FROM rollup_counts WHERE metric = ? AND category = ''", (metric,)
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def _get_rollup_distribution(metric):
+    """Read per-category counters (most common first) kept up to date by the rollup triggers"""
+    results = get_connection().execute("""
+        SELECT category, count
+        FROM rollup_counts
+        WHERE metric = ? AND count > 0
+        ORDER BY count DESC
+    """, (metric,)).fetchall()
+    return {category: count for category, count in results}
+
+
 def get_story_count():
     """Get total number of stories"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM stories")
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count
+        return _get_rollup_total('stories')
     except Exception as e:
         print(f"❌ Error getting count: {e}")
         return 0
@@ -146,47 +820,85 @@ def get_story_count():
 def get_emotion_distribution():
     """Get distribution of emotions for analytics"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
+        return _get_rollup_distribution('story_emotion')
+    except Exception as e:
+        print(f"❌ Error getting emotion distribution: {e}")
+        return {}
+
+
+def get_language_distribution():
+    """Get distribution of story languages"""
+    try:
+        return _get_rollup_distribution('story_language')
+    except Exception as e:
+        print(f"❌ Error getting language distribution: {e}")
+        return {}
+
+
+def get_support_distribution():
+    """Get distribution of requested support types"""
+    try:
+        cursor = get_connection().cursor()
         
         cursor.execute("""
-            SELECT emotion_label, COUNT(*) as count
-            FROM stories
-            WHERE emotion_label IS NOT NULL
-            GROUP BY emotion_label
-            ORDER BY count DESC
+            SELECT t.name, r.count
+            FROM rollup_counts r
+            JOIN support_types t ON t.id = CAST(r.category AS INTEGER)
+            WHERE r.metric = 'story_support' AND r.count > 0
+            ORDER BY r.count DESC
         """)
         
         results = cursor.fetchall()
-        conn.close()
         
-        return {emotion: count for emotion, count in results}
+        return {support: count for support, count in results}
     except Exception as e:
-        print(f"❌ Error getting emotion distribution: {e}")
+        print(f"❌ Error getting support distribution: {e}")
         return {}
 
 
-def get_support_distribution():
-    """Get distribution of requested support types"""
+def get_emotion_support_crosstab(since=None):
+    """
+    Count stories per (emotion, support type) pair for the heatmap
+    since: optional datetime; only stories newer than it are counted
+    Returns {'emotions': [...], 'supports': [...], 'counts': [[...], ...]}
+    with one row of counts per emotion and one column per support type
+    """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
+        cursor = get_connection().cursor()
+        
+        support_types = cursor.execute("SELECT id, name FROM support_types ORDER BY name").fetchall()
+        if not support_types:
+            return {'emotions': [], 'supports': [], 'counts': []}
         
-        cursor.execute("SELECT support_choices FROM stories")
-        all_supports = cursor.fetchall()
-        conn.close()
+        # One SUM(...) column per support type turns the join into a crosstab in SQL
+        columns = ", ".join(f"SUM(ss.support_id = {support_id})" for support_id, _ in support_types)
+        params = []
+        time_clause = ""
+        if since is not None:
+            time_clause = "AND s.created_epoch > ?"
+            params.append(_to_epoch(since))
         
-        # Count each support type
-        support_counts = {}
-        for (support_json,) in all_supports:
-            supports = json.loads(support_json)
-            for support in supports:
-                support_counts[support] = support_counts.get(support, 0) + 1
+        cursor.execute(f"""
+            SELECT s.emotion_label, {columns}
+            FROM stories s
+            JOIN story_support ss ON ss.story_id = s.id
+            WHERE s.emotion_label IS NOT NULL {time_clause}
+            GROUP BY s.emotion_label
+            ORDER BY s.emotion_label
+        """, params)
+        rows = cursor.fetchall()
         
-        return support_counts
+        # Drop support types nobody picked in this window
+        used = [i for i in range(len(support_types)) if any(row[i + 1] for row in rows)]
+        
+        return {
+            'emotions': [row[0] for row in rows],
+            'supports': [support_types[i][1] for i in used],
+            'counts': [[row[i + 1] for i in used] for row in rows]
+        }
     except Exception as e:
-        print(f"❌ Error getting support distribution: {e}")
-        return {}
+        print(f"❌ Error getting emotion-support crosstab: {e}")
+        return {'emotions': [], 'supports': [], 'counts': []}
 
 
 def save_external_sentiment(text_snippet, emotion_label, theme, source_type):
@@ -194,17 +906,12 @@ def save_external_sentiment(text_snippet, emotion_label, theme, source_type):
     Save external sentiment data to database
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO external_sentiment (text_snippet, emotion_label, theme, source_type)
-            VALUES (?, ?, ?, ?)
-        """, (text_snippet, emotion_label, theme, source_type))
-        
-        sentiment_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        with transaction() as conn:
+            cursor = conn.execute("""
+                INSERT INTO external_sentiment (text_snippet, emotion_label, theme, source_type)
+                VALUES (?, ?, ?, ?)
+            """, (text_snippet, emotion_label, theme, source_type))
+            sentiment_id = cursor.lastrowid
         
         return sentiment_id
     except Exception as e:
@@ -212,13 +919,206 @@ def save_external_sentiment(text_snippet, emotion_label, theme, source_type):
         return None
 
 
+def save_external_sentiment_bulk(items, chunk_size=BULK_CHUNK_SIZE):
+    """
+    Save many external sentiment rows at once
+    items: iterable of dicts with text_snippet, theme and source_type, and optionally
+           emotion_label, timestamp and content (the full text to classify, if the
+           snippet is truncated); rows without an emotion_label are classified in batch
+    Items from the scraper also carry item_key, content_hash and source; those are
+    recorded in crawl_seen in the same transaction so they are never ingested twice
+    Each chunk is one transaction; returns the new IDs in input order.
+    Errors are raised, not swallowed: chunks committed before the failure stay saved
+    """
+    sentiment_ids = []
+    items = list(items)
+    
+    for start in range(0, len(items), chunk_size):
+        chunk = items[start:start + chunk_size]
+        
+        unlabelled = [item for item in chunk if not item.get('emotion_label')]
+        labels = iter(_classify_texts([item.get('content', item['text_snippet']) for item in unlabelled]))
+        
+        rows = []
+        for item in chunk:
+            emotion = item.get('emotion_label') or next(labels)[0]
+            rows.append((
+                item.get('timestamp'),
+                item['text_snippet'],
+                emotion,
+                item.get('theme'),
+                item.get('source_type')
+            ))
+        
+        with transaction() as conn:
+            chunk_ids = _insert_chunk(conn, 'external_sentiment', """
+                INSERT INTO external_sentiment (timestamp, text_snippet, emotion_label, theme, source_type)
+                VALUES (COALESCE(?, CURRENT_TIMESTAMP), ?, ?, ?, ?)
+            """, rows)
+            conn.executemany("""
+                INSERT OR IGNORE INTO crawl_seen (item_key, source, content_hash, sentiment_id)
+                VALUES (?, ?, ?, ?)
+            """, [
+                (item['item_key'], item.get('source', ''), item['content_hash'], sentiment_id)
+                for item, sentiment_id in zip(chunk, chunk_ids) if item.get('item_key')
+            ])
+            sentiment_ids.extend(chunk_ids)
+    
+    return sentiment_ids
+
+
+# SQLite's default limit on bound parameters is 999; stay under it per IN (...) query
+SEEN_LOOKUP_CHUNK = 500
+
+
+def get_seen_crawl_items(item_keys, content_hashes):
+    """
+    Which of these scraped items were ingested before
+    Returns (set of known item keys, set of known content hashes)
+    """
+    known_keys, known_hashes = set(), set()
+    try:
+        conn = get_connection()
+        for column, values, found in [('item_key', list(item_keys), known_keys),
+                                      ('content_hash', list(content_hashes), known_hashes)]:
+            for start in range(0, len(values), SEEN_LOOKUP_CHUNK):
+                chunk = values[start:start + SEEN_LOOKUP_CHUNK]
+                found.update(row[0] for row in conn.execute(
+                    f"SELECT {column} FROM crawl_seen WHERE {column} IN ({', '.join('?' * len(chunk))})",
+                    chunk
+                ))
+    except Exception as e:
+        print(f"❌ Error reading crawl state: {e}")
+    return known_keys, known_hashes
+
+
+def get_crawl_high_water(sources):
+    """Newest item time (epoch seconds) already ingested, per source; unknown sources are left out"""
+    sources = list(sources)
+    if not sources:
+        return {}
+    try:
+        rows = get_connection().execute(
+            f"SELECT source, high_water FROM crawl_sources "
+            f"WHERE source IN ({', '.join('?' * len(sources))}) AND high_water IS NOT NULL",
+            sources
+        ).fetchall()
+        return dict(rows)
+    except Exception as e:
+        print(f"❌ Error reading crawl state: {e}")
+        return {}
+
+
+def get_crawl_validators(sources):
+    """
+    Stored ETag/Last-Modified of each source's last full fetch, per source
+    Returns {source: {'ETag': ..., 'Last-Modified': ...}} with only the headers
+    that were sent; sources without validators are left out
+    """
+    sources = list(sources)
+    if not sources:
+        return {}
+    try:
+        rows = get_connection().execute(
+            f"SELECT source, etag, last_modified FROM crawl_sources "
+            f"WHERE source IN ({', '.join('?' * len(sources))}) "
+            f"AND (etag IS NOT NULL OR last_modified IS NOT NULL)",
+            sources
+        ).fetchall()
+        return {
+            source: {name: value for name, value in (('ETag', etag), ('Last-Modified', last_modified)) if value}
+            for source, etag, last_modified in rows
+        }
+    except Exception as e:
+        print(f"❌ Error reading crawl validators: {e}")
+        return {}
+
+
+def save_crawl_high_water(marks):
+    """
+    Advance per-source high-water marks
+    marks: dictionary of source -> epoch seconds; a mark never moves backwards
+    """
+    try:
+        with transaction() as conn:
+            conn.executemany("""
+                INSERT INTO crawl_sources (source, high_water) VALUES (?, ?)
+                ON CONFLICT(source) DO UPDATE SET
+                    high_water = MAX(COALESCE(high_water, excluded.high_water), excluded.high_water),
+                    updated_at = CURRENT_TIMESTAMP
+            """, list(marks.items()))
+        return True
+    except Exception as e:
+        print(f"❌ Error saving crawl state: {e}")
+        return False
+
+
+def save_crawl_validators(validators):
+    """
+    Replace per-source validators
+    validators: dictionary of source -> {'ETag': ..., 'Last-Modified': ...} (either may be missing)
+    """
+    try:
+        with transaction() as conn:
+            conn.executemany("""
+                INSERT INTO crawl_sources (source, etag, last_modified) VALUES (?, ?, ?)
+                ON CONFLICT(source) DO UPDATE SET
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    updated_at = CURRENT_TIMESTAMP
+            """, [
+                (source, headers.get('ETag'), headers.get('Last-Modified'))
+                for source, headers in validators.items()
+            ])
+        return True
+    except Exception as e:
+        print(f"❌ Error saving crawl validators: {e}")
+        return False
+
+
+def get_crawl_frontier(crawl):
+    """Saved frontier state (a JSON string) of an unfinished crawl, or None"""
+    try:
+        row = get_connection().execute(
+            "SELECT state FROM crawl_frontiers WHERE crawl = ?", (crawl,)
+        ).fetchone()
+        return row[0] if row else None
+    except Exception as e:
+        print(f"❌ Error reading crawl frontier: {e}")
+        return None
+
+
+def save_crawl_frontier(crawl, state):
+    """Checkpoint a crawl's frontier (a JSON string), replacing the previous checkpoint"""
+    try:
+        with transaction() as conn:
+            conn.execute("""
+                INSERT INTO crawl_frontiers (crawl, state) VALUES (?, ?)
+                ON CONFLICT(crawl) DO UPDATE SET state = excluded.state, updated_at = CURRENT_TIMESTAMP
+            """, (crawl, state))
+        return True
+    except Exception as e:
+        print(f"❌ Error saving crawl frontier: {e}")
+        return False
+
+
+def clear_crawl_frontier(crawl):
+    """Forget a finished (or abandoned) crawl's frontier"""
+    try:
+        with transaction() as conn:
+            conn.execute("DELETE FROM crawl_frontiers WHERE crawl = ?", (crawl,))
+        return True
+    except Exception as e:
+        print(f"❌ Error clearing crawl frontier: {e}")
+        return False
+
+
 def get_external_sentiment(limit=100):
     """
     Retrieve external sentiment data
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
+        cursor = get_connection().cursor()
         
         cursor.execute("""
             SELECT id, timestamp, text_snippet, emotion_label, theme, source_type
@@ -228,7 +1128,6 @@ def get_external_sentiment(limit=100):
         """, (limit,))
         
         sentiments = cursor.fetchall()
-        conn.close()
         
         # Convert to list of dictionaries
         sentiment_list = []
@@ -248,24 +1147,19 @@ def get_external_sentiment(limit=100):
         return []
 
 
+def get_external_count():
+    """Get total number of external sentiment entries"""
+    try:
+        return _get_rollup_total('external')
+    except Exception as e:
+        print(f"❌ Error getting external count: {e}")
+        return 0
+
+
 def get_external_emotion_distribution():
     """Get distribution of emotions from external sources"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT emotion_label, COUNT(*) as count
-            FROM external_sentiment
-            WHERE emotion_label IS NOT NULL
-            GROUP BY emotion_label
-            ORDER BY count DESC
-        """)
-        
-        results = cursor.fetchall()
-        conn.close()
-        
-        return {emotion: count for emotion, count in results}
+        return _get_rollup_distribution('external_emotion')
     except Exception as e:
         print(f"❌ Error getting external emotion distribution: {e}")
         return {}
@@ -274,25 +1168,7 @@ def get_external_emotion_distribution():
 def get_theme_distribution():
     """Get distribution of themes from external sources"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT theme, COUNT(*) as count
-            FROM external_sentiment
-            WHERE theme IS NOT NULL
-            GROUP BY theme
-            ORDER BY count DESC
-        """)
-        
-        results = cursor.fetchall()
-        conn.close()
-        
-        return {theme: count for theme, count in results}
+        return _get_rollup_distribution('external_theme')
     except Exception as e:
         print(f"❌ Error getting theme distribution: {e}")
         return {}
-
-
-# Initialize database when module is imported
-init_database()
\ No newline at end of file
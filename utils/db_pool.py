@@ -0,0 +1,158 @@
+"""
+SQLite Connection Pool for Voces en Calma
+Keeps tuned, long-lived connections so pages don't reconnect on every query
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+# Connection tuning (applied once per physical connection)
+BUSY_TIMEOUT_MS = 5000
+CACHE_SIZE_KB = 16000          # negative cache_size is interpreted as KiB
+MMAP_SIZE_BYTES = 64 * 1024 * 1024
+MAX_IDLE_CONNECTIONS = 8
+
+
+def _open_connection(db_path):
+    """
+    Open a new connection and apply the performance pragmas
+    Connections run in autocommit mode; use transaction() to group writes
+    """
+    conn = sqlite3.connect(
+        str(db_path),
+        timeout=BUSY_TIMEOUT_MS / 1000,
+        isolation_level=None,
+        check_same_thread=False  # Safe: a connection is only ever used by one thread at a time
+    )
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size={MMAP_SIZE_BYTES}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+
+class _ThreadConnection:
+    """
+    Holds the connection lent to one thread
+    When the thread finishes, its thread-local storage is dropped and the
+    connection goes back to the pool instead of being closed
+    """
+
+    def __init__(self, pool, conn):
+        self.pool = pool
+        self.conn = conn
+
+    def __del__(self):
+        try:
+            self.pool.release(self.conn)
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """
+    Per-thread reusable connections for a single database file
+    Streamlit runs each script rerun on its own thread, so connections are
+    recycled from finished threads rather than opened from scratch
+    """
+
+    def __init__(self, db_path, max_idle=MAX_IDLE_CONNECTIONS):
+        self.db_path = Path(db_path)
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._closed = False
+
+    def get_connection(self):
+        """Return the calling thread's connection, borrowing one if needed"""
+        holder = getattr(self._local, 'holder', None)
+        if holder is None:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                conn = _open_connection(self.db_path)
+            holder = _ThreadConnection(self, conn)
+            self._local.holder = holder
+        return holder.conn
+
+    def release(self, conn):
+        """Return a connection to the idle list (or close it if the pool is full)"""
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            if not self._closed and len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close_thread_connection(self):
+        """Give the calling thread's connection back to the pool right away"""
+        holder = getattr(self._local, 'holder', None)
+        if holder is not None:
+            del self._local.holder
+
+    def close_all(self):
+        """Close every idle connection and stop accepting returned ones"""
+        self.close_thread_connection()
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+# One pool per database file
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path):
+    """Get (or create) the pool for a database file"""
+    key = str(Path(db_path).resolve())
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(db_path)
+            _pools[key] = pool
+        return pool
+
+
+def get_connection(db_path):
+    """Get the calling thread's pooled connection for a database file"""
+    return get_pool(db_path).get_connection()
+
+
+@contextmanager
+def transaction(db_path):
+    """
+    Run a block of statements in a single transaction
+    Commits on success, rolls back on error; nested use joins the outer transaction
+    """
+    conn = get_connection(db_path)
+    if conn.in_transaction:
+        yield conn
+        return
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
+        conn.commit()
+
+
+def close_all_pools():
+    """Close every pooled connection (used by scripts before exiting)"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_all()
@@ -0,0 +1,141 @@
+"""
+Vectorized Emotion Scoring Module
+Scores a batch as sparse (document, keyword) hits found over token ids times a keyword x emotion membership matrix
+"""
+
+from itertools import chain, repeat
+
+import numpy as np
+
+from utils.lexicon import tokenize
+
+# Documents tokenized and scored together; small blocks keep few token lists
+# alive at once, which keeps garbage collection passes cheap
+BLOCK_SIZE = 1000
+
+
+class EmotionMatrixScorer:
+    """
+    Batch version of the keyword scoring in detect_emotion
+    Documents are tokenized, then every token of a block is mapped to a
+    vocabulary id in one C-level pass. Keyword hits are found with NumPy over
+    the id array: single-word keywords by a table lookup, phrases by comparing
+    the ids that follow each candidate first word. The distinct (document,
+    keyword) hits times the membership matrix give the per-emotion counts, so
+    no Python code runs per document or per keyword hit after tokenizing
+    """
+
+    def __init__(self, lexicon):
+        self.lexicon = lexicon
+        self.emotions = list(lexicon.categories)
+        emotion_index = {emotion: j for j, emotion in enumerate(self.emotions)}
+
+        # Keywords with the same tokens ("can't", "can’t") share a pattern; its
+        # membership row is the sum of theirs, as each keyword counts separately
+        patterns = {}
+        for keyword, emotions in lexicon.keyword_categories.items():
+            words = tuple(tokenize(keyword))
+            if not words:
+                continue
+            row = patterns.setdefault(words, np.zeros(len(self.emotions)))
+            for emotion in emotions:
+                row[emotion_index[emotion]] += 1
+        self.patterns = list(patterns)
+        self.membership = np.array(list(patterns.values())).reshape(len(patterns), len(self.emotions))
+
+        # Vocabulary of keyword words; any other token gets id -1
+        self.vocabulary = {}
+        for words in self.patterns:
+            for word in words:
+                self.vocabulary.setdefault(word, len(self.vocabulary))
+
+        # word id -> pattern of the single-word keyword it is; the extra last
+        # slot is what id -1 indexes, so unknown tokens map to -1 too
+        self.single_pattern = np.full(len(self.vocabulary) + 1, -1, dtype=np.int64)
+        self.phrase_starts = np.zeros(len(self.vocabulary) + 1, dtype=bool)
+        self.phrases = []
+        for column, words in enumerate(self.patterns):
+            ids = np.array([self.vocabulary[word] for word in words], dtype=np.int64)
+            if len(ids) == 1:
+                self.single_pattern[ids[0]] = column
+            else:
+                self.phrases.append((column, ids))
+                self.phrase_starts[ids[0]] = True
+        self.longest_phrase = max((len(ids) for _, ids in self.phrases), default=1)
+
+    def _keyword_counts(self, token_lists, lengths):
+        """Documents x emotions counts of distinct keyword hits (lengths: tokens per document)"""
+        tokens = chain.from_iterable(token_lists)
+        ids = np.fromiter(map(self.vocabulary.get, tokens, repeat(-1)), dtype=np.int64, count=int(lengths.sum()))
+        document = np.repeat(np.arange(len(token_lists)), lengths)
+
+        columns = self.single_pattern[ids]
+        hit = columns >= 0
+        hit_documents = [document[hit]]
+        hit_columns = [columns[hit]]
+
+        # Phrases: follow each candidate first word, staying inside its document
+        if self.phrases:
+            padding = np.full(self.longest_phrase, -1, dtype=np.int64)
+            padded_ids = np.concatenate([ids, padding])
+            padded_document = np.concatenate([document, padding])
+            starts = np.flatnonzero(self.phrase_starts[ids])
+            for column, phrase in self.phrases:
+                positions = starts[ids[starts] == phrase[0]]
+                for offset in range(1, len(phrase)):
+                    following = positions + offset
+                    positions = positions[(padded_ids[following] == phrase[offset])
+                                          & (padded_document[following] == document[positions])]
+                hit_documents.append(document[positions])
+                hit_columns.append(np.full(len(positions), column, dtype=np.int64))
+
+        # Distinct (document, pattern) pairs, then per-emotion sums of their membership rows
+        pairs = np.unique(np.concatenate(hit_documents) * len(self.patterns) + np.concatenate(hit_columns))
+        documents, columns = np.divmod(pairs, len(self.patterns))
+        return np.column_stack([
+            np.bincount(documents, weights=self.membership[columns, j], minlength=len(token_lists))
+            for j in range(len(self.emotions))
+        ])
+
+    def score(self, texts, keep_tokens=False):
+        """
+        Score a batch of texts
+        Returns a dictionary of NumPy arrays, one row per text:
+        counts (documents x emotions, distinct keyword hits), word_counts,
+        primary (column of the top emotion, ties go to the first emotion),
+        confidence and has_keywords (False where the VADER fallback applies).
+        With keep_tokens, the per-text token lists are included under tokens
+        """
+        texts = list(texts)
+        blocks = []
+        lengths = []
+        kept_tokens = []
+        for start in range(0, len(texts), BLOCK_SIZE):
+            token_lists = list(map(tokenize, texts[start:start + BLOCK_SIZE]))
+            block_lengths = np.fromiter(map(len, token_lists), dtype=np.int64, count=len(token_lists))
+            blocks.append(self._keyword_counts(token_lists, block_lengths))
+            lengths.append(block_lengths)
+            if keep_tokens:
+                kept_tokens.extend(token_lists)
+
+        if blocks:
+            counts = np.vstack(blocks)
+            word_counts = np.concatenate(lengths).astype(np.float64)
+        else:
+            counts = np.zeros((0, len(self.emotions)))
+            word_counts = np.zeros(0)
+
+        primary = counts.argmax(axis=1) if len(counts) else np.zeros(0, dtype=np.intp)
+        top = counts[np.arange(len(counts)), primary]
+        confidence = np.minimum(top / np.maximum(word_counts / 20, 1), 1.0)
+
+        scores = {
+            'counts': counts,
+            'word_counts': word_counts,
+            'primary': primary,
+            'confidence': confidence,
+            'has_keywords': top > 0
+        }
+        if keep_tokens:
+            scores['tokens'] = kept_tokens
+        return scores
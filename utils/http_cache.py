@@ -0,0 +1,154 @@
+"""
+HTTP Response Cache Module
+Persistent per-URL cache of scraped responses and their validators, so re-crawls can revalidate instead of re-downloading
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+
+from utils import db_pool
+
+# Scraped pages stay out of the app database; set VOCES_HTTP_CACHE_DB to '' to disable caching
+HTTP_CACHE_PATH = os.environ.get(
+    'VOCES_HTTP_CACHE_DB', str(Path(__file__).parent.parent / "data" / "http_cache.db")
+)
+
+
+class HTTPCache:
+    """
+    SQLite table of url -> (status, body, ETag, Last-Modified, content type, fetch time)
+    Only responses carrying a validator are stored: those are the ones a
+    server can answer with 304 Not Modified on the next crawl
+    """
+
+    def __init__(self, db_path=HTTP_CACHE_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.revalidated = 0
+        self.stored = 0
+        self.bytes_downloaded = 0
+        self.bytes_saved = 0
+        self._init_table()
+
+    def _init_table(self):
+        """Create the cache table, disabling the cache if the file can't be used"""
+        try:
+            db_pool.get_connection(self.db_path).execute("""
+                CREATE TABLE IF NOT EXISTS http_cache (
+                    url TEXT PRIMARY KEY,
+                    status INTEGER NOT NULL,
+                    body BLOB NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    content_type TEXT,
+                    fetched_at REAL NOT NULL
+                )
+            """)
+        except Exception as e:
+            print(f"❌ Error opening HTTP cache at {self.db_path}: {e}")
+            self.db_path = None
+
+    def get(self, url):
+        """Cached entry for url as a dictionary, or None"""
+        if not self.db_path:
+            return None
+        try:
+            row = db_pool.get_connection(self.db_path).execute("""
+                SELECT status, body, etag, last_modified, content_type, fetched_at
+                FROM http_cache WHERE url = ?
+            """, (url,)).fetchone()
+        except Exception as e:
+            print(f"❌ Error reading HTTP cache: {e}")
+            return None
+        if row is None:
+            return None
+        return {
+            'status': row[0],
+            'body': row[1],
+            'etag': row[2],
+            'last_modified': row[3],
+            'content_type': row[4],
+            'fetched_at': row[5]
+        }
+
+    @staticmethod
+    def conditional_headers(entry):
+        """If-None-Match / If-Modified-Since headers revalidating a cached entry"""
+        headers = {}
+        if entry and entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url, status, headers, body):
+        """
+        Save a full response if it has a validator
+        headers: the response headers (any case-insensitive mapping)
+        """
+        with self._lock:
+            self.bytes_downloaded += len(body)
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if not self.db_path or not (etag or last_modified):
+            return
+        try:
+            with db_pool.transaction(self.db_path) as conn:
+                conn.execute("""
+                    INSERT OR REPLACE INTO http_cache
+                        (url, status, body, etag, last_modified, content_type, fetched_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, (url, status, body, etag, last_modified, headers.get('Content-Type'), time.time()))
+            with self._lock:
+                self.stored += 1
+        except Exception as e:
+            print(f"❌ Error writing HTTP cache: {e}")
+
+    def mark_revalidated(self, url, entry):
+        """Record a 304 for a cached entry: bump its fetch time and count the bytes not downloaded"""
+        with self._lock:
+            self.revalidated += 1
+            self.bytes_saved += len(entry['body'])
+        try:
+            db_pool.get_connection(self.db_path).execute(
+                "UPDATE http_cache SET fetched_at = ? WHERE url = ?", (time.time(), url)
+            )
+        except Exception as e:
+            print(f"❌ Error writing HTTP cache: {e}")
+
+    def clear(self):
+        """Delete every cached response and reset counters"""
+        with self._lock:
+            self.revalidated = self.stored = self.bytes_downloaded = self.bytes_saved = 0
+        if self.db_path:
+            with db_pool.transaction(self.db_path) as conn:
+                conn.execute("DELETE FROM http_cache")
+
+    def stats(self):
+        """Revalidation and transfer counters for monitoring"""
+        with self._lock:
+            return {
+                'revalidated': self.revalidated,
+                'stored': self.stored,
+                'bytes_downloaded': self.bytes_downloaded,
+                'bytes_saved': self.bytes_saved,
+                'persistent': bool(self.db_path)
+            }
+
+
+_http_cache = None
+_http_cache_lock = threading.Lock()
+
+
+def get_http_cache():
+    """Shared HTTPCache at HTTP_CACHE_PATH (None when caching is disabled)"""
+    global _http_cache
+    if not HTTP_CACHE_PATH:
+        return None
+    if _http_cache is None:
+        with _http_cache_lock:
+            if _http_cache is None:
+                _http_cache = HTTPCache(HTTP_CACHE_PATH)
+    return _http_cache
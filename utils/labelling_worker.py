@@ -0,0 +1,122 @@
+"""
+Background Emotion Labelling Worker
+Drains the durable labelling_queue so story submission doesn't wait on NLP
+"""
+
+import threading
+import time
+
+from utils.database import (
+    get_labelling_batch,
+    complete_labelling,
+    requeue_unlabelled_stories
+)
+from utils.nlp_model import CLASSIFIER_VERSION, analyze
+
+BATCH_SIZE = 100
+POLL_INTERVAL_SECONDS = 5.0
+
+
+def label_pending_batch(batch_size=BATCH_SIZE):
+    """
+    Label one batch from the queue
+    Returns the number of stories taken from the queue (0 when it is empty)
+    """
+    batch = get_labelling_batch(batch_size)
+    if not batch:
+        return 0
+
+    labels = []
+    failures = []
+    features = []
+    for story_id, story_text in batch:
+        try:
+            analysis = analyze(story_text)
+            labels.append((story_id, analysis.primary_emotion, analysis.confidence))
+            features.append({**analysis.features(), 'story_id': story_id})
+        except Exception as e:
+            failures.append((story_id, str(e)))
+
+    if not complete_labelling(labels, failures, features, CLASSIFIER_VERSION):
+        # Nothing was written; back off instead of spinning on the same batch
+        return 0
+    return len(batch)
+
+
+class LabellingWorker(threading.Thread):
+    """
+    Daemon thread that labels queued stories in batches
+    Call notify() after enqueueing to wake it without waiting for the next poll
+    """
+
+    def __init__(self, batch_size=BATCH_SIZE, poll_interval=POLL_INTERVAL_SECONDS):
+        super().__init__(name="voces-labelling-worker", daemon=True)
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+
+    def notify(self):
+        """Wake the worker because new stories were queued"""
+        self._wake.set()
+
+    def stop(self):
+        """Ask the worker to exit after its current batch"""
+        self._stopping.set()
+        self._wake.set()
+
+    def run(self):
+        # Recover stories left unlabelled by a crash or by the inline path failing
+        recovered = requeue_unlabelled_stories()
+        if recovered:
+            print(f"🔁 Requeued {recovered} unlabelled stories")
+
+        while not self._stopping.is_set():
+            try:
+                labelled = label_pending_batch(self.batch_size)
+            except Exception as e:
+                print(f"❌ Labelling worker error: {e}")
+                labelled = 0
+
+            if labelled < self.batch_size:
+                # Queue drained: sleep until notified or the next poll
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def start_labelling_worker():
+    """Start the process-wide worker thread (safe to call repeatedly)"""
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = LabellingWorker()
+            _worker.start()
+        return _worker
+
+
+def drain_queue(batch_size=BATCH_SIZE):
+    """Label everything currently queued and return how many stories were processed"""
+    requeue_unlabelled_stories()
+    total = 0
+    while True:
+        labelled = label_pending_batch(batch_size)
+        if not labelled:
+            return total
+        total += labelled
+
+
+# Run as a standalone worker process: python -m utils.labelling_worker
+if __name__ == "__main__":
+    print("🧠 Labelling worker started (Ctrl+C to stop)")
+    worker = start_labelling_worker()
+    try:
+        while worker.is_alive():
+            time.sleep(1)
+    except KeyboardInterrupt:
+        worker.stop()
+        worker.join()
+        print("👋 Labelling worker stopped")
@@ -0,0 +1,135 @@
+"""
+Language Detection Module
+Tells Spanish from English with character trigram profiles so each text is matched against one lexicon
+"""
+
+import hashlib
+import math
+import re
+import threading
+
+from utils.translations import TRANSLATIONS
+
+SUPPORTED_LANGUAGES = ('en', 'es')
+DEFAULT_LANGUAGE = 'en'
+
+# Only the start of a text is needed to tell the languages apart
+MAX_DETECTION_CHARS = 200
+
+# Per-word scores are memoized; word frequencies are skewed, so most lookups hit
+MAX_CACHED_WORDS = 50000
+
+# Everyday story language, added to the UI strings when building the profiles
+_SEED_TEXT = {
+    'en': """
+        I feel so tired and overwhelmed. My family expects me to take care of everyone and I
+        don't have time for myself. Sometimes I feel guilty when I rest, and I worry about my
+        mother and my kids. Work has been stressful this week and I can't sleep. I want to
+        feel better, I'm learning to set boundaries and I am grateful for the people who
+        listen. It has been hard but I am trying to heal and find some peace.
+    """,
+    'es': """
+        Me siento muy cansada y agobiada. Mi familia espera que cuide a todos y no tengo tiempo
+        para mí. A veces me siento culpable cuando descanso, y me preocupo por mi mamá y por mis
+        hijos. El trabajo ha sido muy estresante esta semana y no puedo dormir. Quiero sentirme
+        mejor, estoy aprendiendo a poner límites y estoy agradecida con las personas que me
+        escuchan. Ha sido difícil pero estoy tratando de sanar y encontrar un poco de paz.
+    """,
+}
+
+_WORDS = re.compile(r"[^\W\d_]+")
+_MARKUP = re.compile(r"<[^>]+>|\{[^}]*\}")
+
+
+def _training_text(language):
+    """UI strings plus seed text for one language, with markup and placeholders removed"""
+    strings = [str(value) for value in TRANSLATIONS[language].values()]
+    return _MARKUP.sub(" ", " ".join(strings + [_SEED_TEXT[language]]))
+
+
+def _trigrams(word):
+    """Character trigrams of one word, with its boundaries marked by spaces"""
+    padded = f" {word} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+class LanguageDetector:
+    """
+    Naive Bayes over character trigrams
+    Each language gets a log-probability table (add-one smoothed); detect()
+    sums table lookups for the text's trigrams and picks the best language.
+    A word always contributes the same trigrams, so scores are cached per word
+    """
+
+    def __init__(self, samples):
+        self.languages = list(samples)
+        self.profiles = {}
+        self.unseen = {}
+        self._word_scores = {}
+        for language, text in samples.items():
+            counts = {}
+            for word in _WORDS.findall(text.lower()):
+                for trigram in _trigrams(word):
+                    counts[trigram] = counts.get(trigram, 0) + 1
+            total = sum(counts.values()) + len(counts) + 1
+            self.profiles[language] = {
+                trigram: math.log((count + 1) / total) for trigram, count in counts.items()
+            }
+            self.unseen[language] = math.log(1 / total)
+
+    def _score_word(self, word):
+        """Log-likelihood of one word under each language, in self.languages order"""
+        scores = self._word_scores.get(word)
+        if scores is None:
+            trigrams = _trigrams(word)
+            scores = tuple(
+                sum(self.profiles[language].get(trigram, self.unseen[language]) for trigram in trigrams)
+                for language in self.languages
+            )
+            if len(self._word_scores) >= MAX_CACHED_WORDS:
+                self._word_scores.clear()
+            self._word_scores[word] = scores
+        return scores
+
+    def scores(self, text):
+        """Log-likelihood of text under each language"""
+        totals = [0.0] * len(self.languages)
+        for word in _WORDS.findall(text[:MAX_DETECTION_CHARS].lower()):
+            for i, score in enumerate(self._score_word(word)):
+                totals[i] += score
+        return dict(zip(self.languages, totals))
+
+    def detect(self, text):
+        """Most likely language code (DEFAULT_LANGUAGE when the text has no letters)"""
+        if not text or not text.strip():
+            return DEFAULT_LANGUAGE
+        scores = self.scores(text)
+        best = max(scores, key=scores.get)
+        # No letters at all: every language scores 0, so don't trust max()
+        return best if scores[best] != 0 else DEFAULT_LANGUAGE
+
+
+# Changes whenever the profile text does, so it can be part of the classifier version
+DETECTOR_FINGERPRINT = hashlib.sha256(
+    "\x00".join(_training_text(language) for language in SUPPORTED_LANGUAGES).encode("utf-8")
+).hexdigest()[:12]
+
+_detector = None
+_detector_lock = threading.Lock()
+
+
+def get_language_detector():
+    """Shared LanguageDetector, built from the profiles the first time it is needed"""
+    global _detector
+    if _detector is None:
+        with _detector_lock:
+            if _detector is None:
+                _detector = LanguageDetector({
+                    language: _training_text(language) for language in SUPPORTED_LANGUAGES
+                })
+    return _detector
+
+
+def detect_language(text):
+    """'en' or 'es' for a piece of text"""
+    return get_language_detector().detect(text)
@@ -0,0 +1,118 @@
+"""
+Compiled Keyword Lexicon Module
+Matches a whole category -> keywords dictionary against text in a single pass
+"""
+
+import re
+
+# Words, keeping inner hyphens/apostrophes together ("self-care", "can't")
+WORD_PATTERN = re.compile(r"\w+(?:[-'’]\w+)*")
+
+
+def tokenize(text):
+    """Lowercase word tokens, with curly apostrophes normalized"""
+    return WORD_PATTERN.findall(text.lower().replace("’", "'"))
+
+
+class CompiledLexicon:
+    """
+    A keyword dictionary compiled once into a first-word index
+
+    Text is tokenized with a single regex pass, then each token is looked up
+    once: only keywords starting with that word are compared, so cost grows
+    with text length rather than with keywords x text length. Keywords only
+    match whole words/phrases ('low' does not match 'allow', 'mad' does not
+    match 'made'), and a keyword listed under several categories counts
+    towards each of them.
+    """
+
+    def __init__(self, categories):
+        self.categories = {category: list(keywords) for category, keywords in categories.items()}
+
+        # keyword -> categories it belongs to
+        self.keyword_categories = {}
+        for category, keywords in self.categories.items():
+            for keyword in keywords:
+                owners = self.keyword_categories.setdefault(keyword.lower(), [])
+                if category not in owners:
+                    owners.append(category)
+
+        # first word -> [(keyword tokens, keyword)], longest phrases first
+        self.first_word_index = {}
+        for keyword in self.keyword_categories:
+            words = tuple(tokenize(keyword))
+            if words:
+                self.first_word_index.setdefault(words[0], []).append((words, keyword))
+        for candidates in self.first_word_index.values():
+            candidates.sort(key=lambda candidate: len(candidate[0]), reverse=True)
+
+    def _matches(self, words):
+        """Yield (word index, phrase length, keyword) for every keyword occurrence"""
+        index = self.first_word_index
+        for i, word in enumerate(words):
+            candidates = index.get(word)
+            if candidates:
+                for phrase, keyword in candidates:
+                    if len(phrase) == 1 or tuple(words[i:i + len(phrase)]) == phrase:
+                        yield i, len(phrase), keyword
+
+    def _category_counts(self, found):
+        """Distinct keywords found -> hits per category, in category order"""
+        category_counts = {}
+        for keyword in found:
+            for category in self.keyword_categories[keyword]:
+                category_counts[category] = category_counts.get(category, 0) + 1
+        # Keep the dictionary's category order so ties break the same way in every process
+        return {
+            category: category_counts[category]
+            for category in self.categories if category in category_counts
+        }
+
+    def match_keywords(self, words):
+        """Set of distinct keywords present in already-tokenized text"""
+        # Set intersection runs in C and rules out almost every keyword at once
+        present = self.first_word_index.keys() & set(words)
+        found = set()
+        if not present:
+            return found
+
+        joined = None
+        for word in present:
+            for phrase, keyword in self.first_word_index[word]:
+                if len(phrase) == 1:
+                    found.add(keyword)
+                    continue
+                # Phrases: space-delimited search over the token stream keeps word boundaries
+                if joined is None:
+                    joined = f" {' '.join(words)} "
+                if f" {' '.join(phrase)} " in joined:
+                    found.add(keyword)
+        return found
+
+    def count_tokens(self, words):
+        """Distinct keyword hits per category for already-tokenized text"""
+        found = self.match_keywords(words)
+        return self._category_counts(found) if found else {}
+
+    def count(self, text):
+        """Distinct keyword hits per category (only categories with hits are included)"""
+        return self.count_tokens(tokenize(text))
+
+    def scan(self, text):
+        """
+        Find every keyword occurrence in one pass
+        Returns (category_counts, spans, word_count) where category_counts maps
+        each category to the number of distinct keywords found, spans is a list
+        of (start, end, keyword) character offsets in text order and word_count
+        is the number of tokens in the text
+        """
+        matches = list(WORD_PATTERN.finditer(text.lower().replace("’", "'")))
+        words = [match.group() for match in matches]
+
+        spans = []
+        found = set()
+        for i, length, keyword in self._matches(words):
+            spans.append((matches[i].start(), matches[i + length - 1].end(), keyword))
+            found.add(keyword)
+
+        return self._category_counts(found), spans, len(words)
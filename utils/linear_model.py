@@ -0,0 +1,149 @@
+"""
+Linear Emotion Model Module
+Hashed unigram/bigram features with a softmax linear classifier, trained offline and run in batches
+"""
+
+import hashlib
+import zlib
+
+import numpy as np
+
+# 2**16 buckets x 9 emotions in float16 is ~1.2 MB before compression
+DEFAULT_BUCKETS = 2 ** 16
+
+
+def hashed_features(words, n_buckets=DEFAULT_BUCKETS):
+    """
+    Bucket indices of a token list's unigrams and bigrams
+    crc32 is stable across processes (unlike hash()), so trained weights stay valid
+    """
+    mask = n_buckets - 1
+    grams = words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+    return [zlib.crc32(gram.encode("utf-8")) & mask for gram in grams]
+
+
+def _sparse_batch(feature_lists):
+    """
+    Sparse document x bucket matrix in coordinate form, from hashed_features() lists
+    Returns (doc_ids, bucket_ids, values); each document's values are scaled
+    by 1/sqrt(features) so long and short texts score on the same scale
+    """
+    lengths = np.fromiter(map(len, feature_lists), dtype=np.int64, count=len(feature_lists))
+    bucket_ids = np.fromiter(
+        (bucket for features in feature_lists for bucket in features),
+        dtype=np.int64, count=int(lengths.sum())
+    )
+    doc_ids = np.repeat(np.arange(len(feature_lists)), lengths)
+    scale = 1.0 / np.sqrt(np.maximum(lengths, 1))
+    return doc_ids, bucket_ids, scale[doc_ids]
+
+
+def _softmax(scores):
+    """Row-wise softmax"""
+    scores = scores - scores.max(axis=1, keepdims=True)
+    np.exp(scores, out=scores)
+    scores /= scores.sum(axis=1, keepdims=True)
+    return scores
+
+
+class LinearEmotionModel:
+    """
+    Softmax regression over hashed text features
+    predict_proba() scores a whole batch with one gather and one bincount per
+    emotion, so there is no per-document Python work after hashing
+    """
+
+    def __init__(self, weights, bias, labels):
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.labels = list(labels)
+        self.n_buckets = self.weights.shape[0]
+
+    def _scores(self, feature_lists):
+        """Raw class scores, documents x emotions"""
+        doc_ids, bucket_ids, values = _sparse_batch(feature_lists)
+        contributions = self.weights[bucket_ids] * values[:, None].astype(np.float32)
+        scores = np.empty((len(feature_lists), len(self.labels)), dtype=np.float64)
+        for column in range(len(self.labels)):
+            scores[:, column] = np.bincount(
+                doc_ids, weights=contributions[:, column], minlength=len(feature_lists)
+            )
+        return scores + self.bias
+
+    def predict_proba(self, token_lists):
+        """Class probabilities, documents x emotions (columns follow self.labels)"""
+        feature_lists = [hashed_features(words, self.n_buckets) for words in token_lists]
+        return _softmax(self._scores(feature_lists))
+
+    def predict(self, token_lists):
+        """List of (label, probability) per document"""
+        probabilities = self.predict_proba(token_lists)
+        best = probabilities.argmax(axis=1)
+        best_probabilities = probabilities[np.arange(len(best)), best]
+        return [
+            (self.labels[column], probability)
+            for column, probability in zip(best.tolist(), best_probabilities.tolist())
+        ]
+
+    def save(self, path):
+        """Write the model as a compressed .npz (weights stored as float16)"""
+        np.savez_compressed(
+            path,
+            weights=self.weights.astype(np.float16),
+            bias=self.bias,
+            labels=np.array(self.labels)
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Read a model written by save()"""
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data['weights'], data['bias'], data['labels'].tolist())
+
+
+def model_fingerprint(path):
+    """Short content hash of a model file, used as its classifier version"""
+    with open(path, "rb") as model_file:
+        return hashlib.sha256(model_file.read()).hexdigest()[:12]
+
+
+def train_linear_model(token_lists, labels, n_buckets=DEFAULT_BUCKETS, epochs=8,
+                       batch_size=256, learning_rate=8.0, l2=1e-6, seed=42):
+    """
+    Fit a softmax regression with mini-batch SGD
+    token_lists: tokenized training texts; labels: emotion label per text
+    Returns a LinearEmotionModel
+    """
+    classes = sorted(set(labels))
+    class_index = {label: i for i, label in enumerate(classes)}
+    targets = np.array([class_index[label] for label in labels])
+
+    # Hash once up front; every epoch reuses the same feature lists
+    feature_lists = [hashed_features(words, n_buckets) for words in token_lists]
+
+    rng = np.random.default_rng(seed)
+    weights = np.zeros((n_buckets, len(classes)), dtype=np.float32)
+    bias = np.zeros(len(classes), dtype=np.float32)
+    model = LinearEmotionModel(weights, bias, classes)
+
+    for epoch in range(epochs):
+        order = rng.permutation(len(token_lists))
+        rate = learning_rate / (1 + epoch)
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            batch_features = [feature_lists[i] for i in batch]
+
+            # Gradient of the cross-entropy: predicted minus one-hot, per document
+            delta = _softmax(model._scores(batch_features))
+            delta[np.arange(len(batch)), targets[batch]] -= 1
+            delta /= len(batch)
+
+            doc_ids, bucket_ids, values = _sparse_batch(batch_features)
+            for column in range(len(classes)):
+                gradient = np.bincount(
+                    bucket_ids, weights=values * delta[doc_ids, column], minlength=n_buckets
+                )
+                model.weights[:, column] -= rate * (gradient + l2 * model.weights[:, column])
+            model.bias -= rate * delta.sum(axis=0).astype(np.float32)
+
+    return model
@@ -0,0 +1,435 @@
+"""
+Schema Migrations for Voces en Calma
+Ordered, versioned schema changes applied in place to the live database
+"""
+
+import json
+
+from utils import db_pool
+
+
+def _add_story_indexes(conn):
+    """Index stories for recent-first listing and emotion grouping"""
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_stories_timestamp
+        ON stories(timestamp, id)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_stories_emotion
+        ON stories(emotion_label)
+    """)
+
+
+def _add_external_sentiment_indexes(conn):
+    """Index external sentiment for recent-first listing and theme/emotion grouping"""
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_external_timestamp
+        ON external_sentiment(timestamp, id)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_external_theme_emotion
+        ON external_sentiment(theme, emotion_label)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_external_emotion
+        ON external_sentiment(emotion_label)
+    """)
+
+
+# Canonical support types as of migration 3 - ids are permanent, never reuse them
+_SUPPORT_TYPE_SEED = [
+    (1, 'journaling', 'Journaling prompts'),
+    (2, 'group_circles', 'Virtual group circles'),
+    (3, 'one_on_one', 'One-on-one coaching'),
+    (4, 'art_therapy', 'Art/creative therapy'),
+    (5, 'bodywork', 'Massage/bodywork'),
+    (6, 'spiritual', 'Spiritual/faith-rooted support'),
+    (7, 'self_study', 'Quiet self-study resources'),
+    (8, 'somatic', 'Movement/somatic practices'),
+    (9, 'herbal', 'Herbal remedies & traditional healing'),
+]
+
+
+def _add_story_support(conn):
+    """Move support choices out of the JSON blob into an indexed junction table"""
+    # Deferred import: database.py imports this module
+    from utils.database import resolve_support_ids
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS support_types (
+            id INTEGER PRIMARY KEY,
+            support_key TEXT UNIQUE,
+            name TEXT NOT NULL UNIQUE
+        )
+    """)
+    conn.executemany(
+        "INSERT OR IGNORE INTO support_types (id, support_key, name) VALUES (?, ?, ?)",
+        _SUPPORT_TYPE_SEED
+    )
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS story_support (
+            story_id INTEGER NOT NULL REFERENCES stories(id) ON DELETE CASCADE,
+            support_id INTEGER NOT NULL REFERENCES support_types(id),
+            PRIMARY KEY (story_id, support_id)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_story_support_support
+        ON story_support(support_id, story_id)
+    """)
+
+    # Backfill existing stories
+    rows = conn.execute("SELECT id, support_choices FROM stories").fetchall()
+    for story_id, support_json in rows:
+        support_ids = resolve_support_ids(conn, json.loads(support_json))
+        conn.executemany(
+            "INSERT OR IGNORE INTO story_support (story_id, support_id) VALUES (?, ?)",
+            [(story_id, support_id) for support_id in support_ids]
+        )
+
+
+def _bump(metric, category, delta, condition="1"):
+    """SQL that adds delta to one rollup counter (used inside trigger bodies)"""
+    return f"""
+        INSERT INTO rollup_counts (metric, category, count)
+        SELECT '{metric}', {category}, {delta} WHERE {condition}
+        ON CONFLICT (metric, category) DO UPDATE SET count = count + {delta};"""
+
+
+def _rollup_trigger(name, event, table, body, when=None):
+    """Build a CREATE TRIGGER statement for a rollup counter"""
+    when_clause = f"WHEN {when}" if when else ""
+    return f"""
+        CREATE TRIGGER IF NOT EXISTS {name}
+        AFTER {event} ON {table}
+        FOR EACH ROW {when_clause}
+        BEGIN {body}
+        END
+    """
+
+
+def _add_rollup_counts(conn):
+    """Trigger-maintained counters so dashboard metrics don't scan the base tables"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS rollup_counts (
+            metric TEXT NOT NULL,
+            category TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (metric, category)
+        ) WITHOUT ROWID
+    """)
+
+    triggers = [
+        # Stories: total, per-emotion, per-language
+        _rollup_trigger("trg_rollup_stories_insert", "INSERT", "stories",
+                        _bump('stories', "''", 1)
+                        + _bump('story_emotion', "NEW.emotion_label", 1, "NEW.emotion_label IS NOT NULL")
+                        + _bump('story_language', "NEW.language", 1, "NEW.language IS NOT NULL")),
+        _rollup_trigger("trg_rollup_stories_delete", "DELETE", "stories",
+                        _bump('stories', "''", -1)
+                        + _bump('story_emotion', "OLD.emotion_label", -1, "OLD.emotion_label IS NOT NULL")
+                        + _bump('story_language', "OLD.language", -1, "OLD.language IS NOT NULL")),
+        _rollup_trigger("trg_rollup_stories_emotion", "UPDATE OF emotion_label", "stories",
+                        _bump('story_emotion', "OLD.emotion_label", -1, "OLD.emotion_label IS NOT NULL")
+                        + _bump('story_emotion', "NEW.emotion_label", 1, "NEW.emotion_label IS NOT NULL"),
+                        when="OLD.emotion_label IS NOT NEW.emotion_label"),
+        _rollup_trigger("trg_rollup_stories_language", "UPDATE OF language", "stories",
+                        _bump('story_language', "OLD.language", -1, "OLD.language IS NOT NULL")
+                        + _bump('story_language', "NEW.language", 1, "NEW.language IS NOT NULL"),
+                        when="OLD.language IS NOT NEW.language"),
+
+        # Support requests (one row per story/support pair)
+        _rollup_trigger("trg_rollup_support_insert", "INSERT", "story_support",
+                        _bump('story_support', "NEW.support_id", 1)),
+        _rollup_trigger("trg_rollup_support_delete", "DELETE", "story_support",
+                        _bump('story_support', "OLD.support_id", -1)),
+        _rollup_trigger("trg_rollup_support_update", "UPDATE OF support_id", "story_support",
+                        _bump('story_support', "OLD.support_id", -1)
+                        + _bump('story_support', "NEW.support_id", 1),
+                        when="OLD.support_id IS NOT NEW.support_id"),
+
+        # External sentiment: total, per-emotion, per-theme
+        _rollup_trigger("trg_rollup_external_insert", "INSERT", "external_sentiment",
+                        _bump('external', "''", 1)
+                        + _bump('external_emotion', "NEW.emotion_label", 1, "NEW.emotion_label IS NOT NULL")
+                        + _bump('external_theme', "NEW.theme", 1, "NEW.theme IS NOT NULL")),
+        _rollup_trigger("trg_rollup_external_delete", "DELETE", "external_sentiment",
+                        _bump('external', "''", -1)
+                        + _bump('external_emotion', "OLD.emotion_label", -1, "OLD.emotion_label IS NOT NULL")
+                        + _bump('external_theme', "OLD.theme", -1, "OLD.theme IS NOT NULL")),
+        _rollup_trigger("trg_rollup_external_emotion", "UPDATE OF emotion_label", "external_sentiment",
+                        _bump('external_emotion', "OLD.emotion_label", -1, "OLD.emotion_label IS NOT NULL")
+                        + _bump('external_emotion', "NEW.emotion_label", 1, "NEW.emotion_label IS NOT NULL"),
+                        when="OLD.emotion_label IS NOT NEW.emotion_label"),
+        _rollup_trigger("trg_rollup_external_theme", "UPDATE OF theme", "external_sentiment",
+                        _bump('external_theme', "OLD.theme", -1, "OLD.theme IS NOT NULL")
+                        + _bump('external_theme', "NEW.theme", 1, "NEW.theme IS NOT NULL"),
+                        when="OLD.theme IS NOT NEW.theme"),
+    ]
+    for trigger_sql in triggers:
+        conn.execute(trigger_sql)
+
+    # Seed the counters from the existing rows (same transaction, so no updates are missed)
+    conn.execute("DELETE FROM rollup_counts")
+    conn.execute("""
+        INSERT INTO rollup_counts (metric, category, count)
+        SELECT 'stories', '', COUNT(*) FROM stories
+        UNION ALL
+        SELECT 'story_emotion', emotion_label, COUNT(*) FROM stories
+        WHERE emotion_label IS NOT NULL GROUP BY emotion_label
+        UNION ALL
+        SELECT 'story_language', language, COUNT(*) FROM stories
+        WHERE language IS NOT NULL GROUP BY language
+        UNION ALL
+        SELECT 'story_support', support_id, COUNT(*) FROM story_support GROUP BY support_id
+        UNION ALL
+        SELECT 'external', '', COUNT(*) FROM external_sentiment
+        UNION ALL
+        SELECT 'external_emotion', emotion_label, COUNT(*) FROM external_sentiment
+        WHERE emotion_label IS NOT NULL GROUP BY emotion_label
+        UNION ALL
+        SELECT 'external_theme', theme, COUNT(*) FROM external_sentiment
+        WHERE theme IS NOT NULL GROUP BY theme
+    """)
+
+
+def _add_story_filter_indexes(conn):
+    """Composite indexes so filtered keyset pages seek straight to the cursor"""
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_stories_emotion_timestamp
+        ON stories(emotion_label, timestamp, id)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_stories_language_timestamp
+        ON stories(language, timestamp, id)
+    """)
+    # Superseded by idx_stories_emotion_timestamp (same leading column)
+    conn.execute("DROP INDEX IF EXISTS idx_stories_emotion")
+
+
+def _column_exists(conn, table, column):
+    """Check for a column, including generated (hidden from table_info) ones"""
+    return any(row[1] == column for row in conn.execute(f"PRAGMA table_xinfo({table})"))
+
+
+def _add_time_columns(conn):
+    """
+    Generated epoch/day/week columns derived from the text timestamp
+    They are VIRTUAL, so existing rows need no rewrite and inserts need no changes;
+    the indexes store the computed values for range scans
+    """
+    for table, prefix in [('stories', 'stories'), ('external_sentiment', 'external')]:
+        if not _column_exists(conn, table, 'created_epoch'):
+            conn.execute(f"""
+                ALTER TABLE {table} ADD COLUMN created_epoch INTEGER
+                GENERATED ALWAYS AS (CAST(strftime('%s', timestamp) AS INTEGER)) VIRTUAL
+            """)
+        if not _column_exists(conn, table, 'created_day'):
+            conn.execute(f"""
+                ALTER TABLE {table} ADD COLUMN created_day TEXT
+                GENERATED ALWAYS AS (date(timestamp)) VIRTUAL
+            """)
+        if not _column_exists(conn, table, 'created_week'):
+            # Monday of the ISO week, e.g. '2026-01-05'
+            conn.execute(f"""
+                ALTER TABLE {table} ADD COLUMN created_week TEXT
+                GENERATED ALWAYS AS (date(timestamp, 'weekday 0', '-6 days')) VIRTUAL
+            """)
+        conn.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_{prefix}_epoch
+            ON {table}(created_epoch)
+        """)
+        conn.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_{prefix}_week_emotion
+            ON {table}(created_week, emotion_label)
+        """)
+
+
+def _add_labelling_queue(conn):
+    """Durable queue of stories waiting for background emotion labelling"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS labelling_queue (
+            story_id INTEGER PRIMARY KEY REFERENCES stories(id) ON DELETE CASCADE,
+            enqueued_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT
+        )
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_labelling_queue_pending
+        ON labelling_queue(attempts, enqueued_at)
+    """)
+
+
+# Emotion columns of story_features, frozen as of migration 8 (add new ones in a later migration)
+STORY_FEATURE_EMOTIONS = (
+    'anxiety', 'sadness', 'exhaustion', 'guilt', 'anger',
+    'hope', 'overwhelm', 'family_stress', 'neutral'
+)
+
+
+def _add_story_features(conn):
+    """One row of numeric NLP features per story, for analytics without re-running NLP"""
+    emotion_columns = ",\n".join(
+        f"            {emotion} INTEGER NOT NULL DEFAULT 0" for emotion in STORY_FEATURE_EMOTIONS
+    )
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS story_features (
+            story_id INTEGER PRIMARY KEY REFERENCES stories(id) ON DELETE CASCADE,
+{emotion_columns},
+            keyword_hits INTEGER NOT NULL DEFAULT 0,
+            vader_compound REAL,
+            vader_pos REAL,
+            vader_neg REAL,
+            vader_neu REAL,
+            word_count INTEGER,
+            classifier_version TEXT NOT NULL,
+            computed_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_story_features_version
+        ON story_features(classifier_version)
+    """)
+
+
+def _add_classifier_versions(conn):
+    """Record which classifier produced each story label, plus checkpoints for resumable jobs"""
+    if not _column_exists(conn, "stories", "classifier_version"):
+        conn.execute("ALTER TABLE stories ADD COLUMN classifier_version TEXT")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS job_checkpoints (
+            job TEXT PRIMARY KEY,
+            classifier_version TEXT,
+            last_id INTEGER NOT NULL DEFAULT 0,
+            processed INTEGER NOT NULL DEFAULT 0,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def _add_crawl_state(conn):
+    """Remember which scraped items were already ingested, and how far each source has been read"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS crawl_seen (
+            item_key TEXT PRIMARY KEY,
+            source TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            sentiment_id INTEGER REFERENCES external_sentiment(id) ON DELETE SET NULL,
+            first_seen DATETIME DEFAULT CURRENT_TIMESTAMP
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_crawl_seen_hash ON crawl_seen(content_hash)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS crawl_sources (
+            source TEXT PRIMARY KEY,
+            high_water REAL NOT NULL,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def _add_crawl_frontiers(conn):
+    """Checkpoints of in-progress link-following crawls, so long crawls can resume"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS crawl_frontiers (
+            crawl TEXT PRIMARY KEY,
+            state TEXT NOT NULL,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def _add_crawl_validators(conn):
+    """
+    Keep feed ETag/Last-Modified validators with each source's crawl state
+    A feed's validators can be stored before any of its items are, so the table
+    is rebuilt with a nullable high_water (SQLite can't drop NOT NULL in place)
+    """
+    conn.execute("""
+        CREATE TABLE crawl_sources_new (
+            source TEXT PRIMARY KEY,
+            high_water REAL,
+            etag TEXT,
+            last_modified TEXT,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        INSERT INTO crawl_sources_new (source, high_water, updated_at)
+        SELECT source, high_water, updated_at FROM crawl_sources
+    """)
+    conn.execute("DROP TABLE crawl_sources")
+    conn.execute("ALTER TABLE crawl_sources_new RENAME TO crawl_sources")
+
+
+# (version, description, step) - append only, never renumber or edit applied steps
+MIGRATIONS = [
+    (1, "Index stories by timestamp and emotion", _add_story_indexes),
+    (2, "Index external sentiment by timestamp, theme and emotion", _add_external_sentiment_indexes),
+    (3, "Normalize support choices into story_support", _add_story_support),
+    (4, "Add trigger-maintained rollup counters", _add_rollup_counts),
+    (5, "Index stories for filtered keyset pagination", _add_story_filter_indexes),
+    (6, "Add indexed epoch, day and week columns", _add_time_columns),
+    (7, "Add labelling_queue for background emotion labelling", _add_labelling_queue),
+    (8, "Add story_features for per-story NLP feature vectors", _add_story_features),
+    (9, "Add stories.classifier_version and job checkpoints", _add_classifier_versions),
+    (10, "Add crawl_seen and crawl_sources for incremental scraping", _add_crawl_state),
+    (11, "Add crawl_frontiers for resumable link-following crawls", _add_crawl_frontiers),
+    (12, "Add feed validators to crawl_sources", _add_crawl_validators),
+]
+
+
+def _ensure_version_table(conn):
+    """Create the schema_version bookkeeping table if needed"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def get_schema_version(db_path):
+    """Return the highest applied migration version (0 for a fresh database)"""
+    conn = db_pool.get_connection(db_path)
+    _ensure_version_table(conn)
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def run_migrations(db_path):
+    """
+    Apply every pending migration in order
+    Each step runs in its own transaction together with its version record,
+    so an interrupted run resumes cleanly and concurrent servers don't race
+    Returns the list of versions applied by this call
+    """
+    applied = []
+    # Up-to-date databases (every start after the first) skip the write locks below
+    if get_schema_version(db_path) >= MIGRATIONS[-1][0]:
+        return applied
+
+    for version, description, step in MIGRATIONS:
+        with db_pool.transaction(db_path) as conn:
+            # Re-check inside the write lock in case another process got here first
+            already = conn.execute(
+                "SELECT 1 FROM schema_version WHERE version = ?", (version,)
+            ).fetchone()
+            if already:
+                continue
+
+            step(conn)
+            conn.execute(
+                "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                (version, description)
+            )
+            applied.append(version)
+            print(f"🛠️ Applied migration {version}: {description}")
+
+    if applied:
+        # Refresh planner statistics so the new indexes get used
+        db_pool.get_connection(db_path).execute("PRAGMA optimize")
+
+    return applied
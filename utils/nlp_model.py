@@ -3,14 +3,37 @@ NLP Emotion Detection Module
 Analyzes stories and tags them with emotional themes
 """
 
+import hashlib
+import json
+import os
 import re
-try:
-    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-except (ImportError, ModuleNotFoundError):
-    from vaderSentiment import SentimentIntensityAnalyzer
+import threading
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
 
-# Initialize VADER sentiment analyzer
-vader_analyzer = SentimentIntensityAnalyzer()
+from utils.analysis_cache import AnalysisCache, DEFAULT_MAX_SIZE, make_cache_key
+from utils.language import DEFAULT_LANGUAGE, DETECTOR_FINGERPRINT, detect_language
+from utils.lexicon import CompiledLexicon, tokenize
+from utils.vader_lexicon import create_sentiment_analyzer
+
+# VADER maps its compiled lexicon file (compiling it if needed) when constructed, so it is built on first use
+_vader_analyzer = None
+_vader_lock = threading.Lock()
+
+
+def get_vader_analyzer():
+    """
+    Shared VADER sentiment analyzer, created the first time it is needed
+    Its lexicon is a read-only memory map, so every process on the host shares the same pages
+    """
+    global _vader_analyzer
+    if _vader_analyzer is None:
+        with _vader_lock:
+            if _vader_analyzer is None:
+                _vader_analyzer = create_sentiment_analyzer()
+    return _vader_analyzer
 
 # Emotion keyword dictionaries (culturally relevant for Latina community)
 EMOTION_KEYWORDS = {
@@ -56,23 +79,217 @@ EMOTION_KEYWORDS = {
     ]
 }
 
+# Spanish keywords for the same emotions (gendered and unaccented spellings included)
+EMOTION_KEYWORDS_ES = {
+    'anxiety': [
+        'ansiedad', 'ansiosa', 'ansioso', 'preocupada', 'preocupado', 'preocupación',
+        'preocupacion', 'nerviosa', 'nervioso', 'pánico', 'panico', 'miedo', 'asustada',
+        'estrés', 'estres', 'estresada', 'estresado', 'tensa', 'angustia', 'angustiada', 'inquieta'
+    ],
+    'sadness': [
+        'triste', 'tristeza', 'deprimida', 'deprimido', 'depresión', 'depresion', 'llorando',
+        'lágrimas', 'lagrimas', 'soledad', 'sola', 'aislada', 'vacía', 'vacia', 'duelo',
+        'pérdida', 'desesperanza', 'sin esperanza'
+    ],
+    'exhaustion': [
+        'agotada', 'agotado', 'agotamiento', 'cansada', 'cansado', 'cansancio', 'exhausta',
+        'exhausto', 'sin energía', 'sin energia', 'quemada', 'desgastada', 'no puedo más',
+        'no puedo mas', 'sin dormir', 'insomnio'
+    ],
+    'guilt': [
+        'culpa', 'culpable', 'vergüenza', 'verguenza', 'avergonzada', 'debería', 'deberia',
+        'mala madre', 'mala hija', 'no soy suficiente', 'egoísta', 'egoista', 'fracasando',
+        'decepcionada'
+    ],
+    'anger': [
+        'enojada', 'enojado', 'enojo', 'coraje', 'furiosa', 'rabia', 'frustrada', 'frustrado',
+        'frustración', 'frustracion', 'molesta', 'resentimiento', 'injusto', 'harta', 'harto'
+    ],
+    'hope': [
+        'esperanza', 'mejor', 'mejorando', 'sanando', 'sanación', 'sanacion', 'crecimiento',
+        'aprendiendo', 'agradecida', 'agradecido', 'paz', 'calma', 'alivio', 'tranquila'
+    ],
+    'overwhelm': [
+        'abrumada', 'abrumado', 'agobiada', 'agobiado', 'demasiado', 'ahogando', 'ahogándome',
+        'presión', 'presion', 'carga', 'pesada', 'todo a la vez'
+    ],
+    'family_stress': [
+        'familia', 'madre', 'mamá', 'hija', 'hermana', 'abuela', 'suegra', 'expectativas',
+        'tradición', 'tradicion', 'obligaciones', 'cuidar', 'cuidadora', 'responsable de todos'
+    ]
+}
 
-def detect_emotion(text):
+# Compiled once per language; detect_language() routes each text to exactly one of them
+EMOTION_LEXICONS = {
+    'en': CompiledLexicon(EMOTION_KEYWORDS),
+    'es': CompiledLexicon(EMOTION_KEYWORDS_ES)
+}
+EMOTION_LEXICON = EMOTION_LEXICONS['en']
+
+# Every label analyze() can produce (keyword emotions plus the neutral fallback)
+FEATURE_EMOTIONS = list(EMOTION_KEYWORDS) + ['neutral']
+
+# VADER compound score beyond which a keyword-less text is labelled sadness/hope
+SENTIMENT_FALLBACK_THRESHOLD = 0.3
+
+# Which classifier picks the primary emotion, chosen per deployment:
+# 'lexicon' (keywords + VADER fallback) or 'linear' (model from train_emotion_model.py)
+CLASSIFIER_BACKEND = os.environ.get('VOCES_CLASSIFIER', 'lexicon')
+EMOTION_MODEL_PATH = Path(os.environ.get(
+    'VOCES_EMOTION_MODEL', Path(__file__).parent.parent / "data" / "emotion_model.npz"
+))
+
+if CLASSIFIER_BACKEND == 'linear' and not EMOTION_MODEL_PATH.exists():
+    print(f"❌ Emotion model not found at {EMOTION_MODEL_PATH}, using the lexicon classifier")
+    CLASSIFIER_BACKEND = 'lexicon'
+
+# Bump when the scoring logic below changes; keyword and threshold edits change
+# the fingerprint on their own. Stored with every label so stale ones can be relabelled
+CLASSIFIER_REVISION = 3
+if CLASSIFIER_BACKEND == 'linear':
+    # Deferred import: NumPy is only needed when the linear model is in use
+    from utils.linear_model import model_fingerprint
+    CLASSIFIER_VERSION = f"linear-{model_fingerprint(EMOTION_MODEL_PATH)}"
+else:
+    CLASSIFIER_VERSION = f"{CLASSIFIER_REVISION}-" + hashlib.sha256(json.dumps({
+        'keywords': EMOTION_KEYWORDS,
+        'keywords_es': EMOTION_KEYWORDS_ES,
+        'language_detector': DETECTOR_FINGERPRINT,
+        'fallback_threshold': SENTIMENT_FALLBACK_THRESHOLD
+    }, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+_linear_model = None
+_linear_model_lock = threading.Lock()
+
+
+def get_linear_model():
+    """The deployment's LinearEmotionModel, loaded the first time it is needed"""
+    global _linear_model
+    if _linear_model is None:
+        with _linear_model_lock:
+            if _linear_model is None:
+                from utils.linear_model import LinearEmotionModel
+                _linear_model = LinearEmotionModel.load(EMOTION_MODEL_PATH)
+    return _linear_model
+
+# Results cache in front of analyze() (and so detect_emotion / get_emotion_summary)
+# Set VOCES_NLP_CACHE_DB to a file path to keep results across restarts
+analysis_cache = AnalysisCache(
+    max_size=int(os.environ.get('VOCES_NLP_CACHE_SIZE', DEFAULT_MAX_SIZE)),
+    db_path=os.environ.get('VOCES_NLP_CACHE_DB') or None
+)
+
+
+def get_cache_stats():
+    """Hit/miss counters of the analysis cache, for monitoring"""
+    return analysis_cache.stats()
+
+
+class EmotionAnalysis:
     """
-    Detect primary and secondary emotions in text
-    Returns: (primary_emotion, confidence, all_emotions_dict)
+    Everything one pass over a text produces
+    emotion_counts holds distinct keyword hits per emotion (or the VADER
+    fallback emotion with a count of 1), keyword_spans holds
+    (start, end, keyword) character offsets, word_count counts tokens and
+    language is the detected language whose lexicon was used
+    vader_scores is None when the analysis was run without sentiment and
+    keywords were found (VADER was never needed)
     """
-    text_lower = text.lower()
+
+    __slots__ = (
+        'primary_emotion', 'confidence', 'emotion_counts',
+        'vader_scores', 'keyword_spans', 'word_count', 'language'
+    )
+
+    def __init__(self, primary_emotion, confidence, emotion_counts,
+                 vader_scores, keyword_spans, word_count, language=DEFAULT_LANGUAGE):
+        self.primary_emotion = primary_emotion
+        self.confidence = confidence
+        self.emotion_counts = emotion_counts
+        self.vader_scores = vader_scores
+        self.keyword_spans = keyword_spans
+        self.word_count = word_count
+        self.language = language
+
+    def __repr__(self):
+        return (f"EmotionAnalysis({self.primary_emotion!r}, confidence={self.confidence:.2f}, "
+                f"emotions={self.emotion_counts!r})")
+
+    def as_tuple(self):
+        """The (primary_emotion, confidence, all_emotions_dict) shape of detect_emotion"""
+        return self.primary_emotion, self.confidence, dict(self.emotion_counts)
+
+    def features(self):
+        """
+        Flat numeric feature values for the story_features table
+        One count per emotion, keyword hit total, VADER scores, word count and
+        the classifier version that produced them
+        """
+        vader_scores = self.vader_scores or {}
+        values = {emotion: 0 for emotion in FEATURE_EMOTIONS}
+        values.update(self.emotion_counts)
+        values.update({
+            'keyword_hits': len(self.keyword_spans),
+            'vader_compound': vader_scores.get('compound'),
+            'vader_pos': vader_scores.get('pos'),
+            'vader_neg': vader_scores.get('neg'),
+            'vader_neu': vader_scores.get('neu'),
+            'word_count': self.word_count,
+            'classifier_version': CLASSIFIER_VERSION
+        })
+        return values
+
+    def to_dict(self):
+        """JSON-serializable form (used by the analysis cache)"""
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild from to_dict() output, copying so the source can't be modified through it"""
+        return cls(
+            data['primary_emotion'],
+            data['confidence'],
+            dict(data['emotion_counts']),
+            dict(data['vader_scores']) if data['vader_scores'] is not None else None,
+            [tuple(span) for span in data['keyword_spans']],
+            data['word_count'],
+            data.get('language', DEFAULT_LANGUAGE)
+        )
+
+
+def _sentiment_fallback(vader_scores):
+    """(emotion, confidence, counts) for a text without emotion keywords"""
+    if vader_scores['compound'] <= -SENTIMENT_FALLBACK_THRESHOLD:
+        return 'sadness', abs(vader_scores['compound']), {'sadness': 1}
+    elif vader_scores['compound'] >= SENTIMENT_FALLBACK_THRESHOLD:
+        return 'hope', vader_scores['compound'], {'hope': 1}
+    else:
+        return 'neutral', 0.5, {'neutral': 1}
+
+
+def _model_label(label, probability, keyword_counts):
+    """(emotion, confidence, counts) from the linear model; counts stay keyword hits"""
+    return label, probability, keyword_counts or {label: 1}
+
+
+def _run_analysis(text, include_sentiment=True):
+    """Uncached analysis behind analyze()"""
+    # Scan with the text's own language only, tokenizing once: keyword counts,
+    # spans and the word count all come from this scan
+    language = detect_language(text)
+    emotion_scores, spans, word_count = EMOTION_LEXICONS[language].scan(text)
     
-    # Get VADER sentiment scores
-    vader_scores = vader_analyzer.polarity_scores(text)
+    if CLASSIFIER_BACKEND == 'linear':
+        label, probability = get_linear_model().predict([tokenize(text)])[0]
+        primary_emotion, confidence, emotion_scores = _model_label(label, probability, emotion_scores)
+        vader_scores = get_vader_analyzer().polarity_scores(text) if include_sentiment else None
+        return EmotionAnalysis(primary_emotion, confidence, emotion_scores, vader_scores,
+                               spans, word_count, language)
     
-    # Count emotion keywords
-    emotion_scores = {}
-    for emotion, keywords in EMOTION_KEYWORDS.items():
-        count = sum(1 for keyword in keywords if keyword in text_lower)
-        if count > 0:
-            emotion_scores[emotion] = count
+    # VADER is the expensive part, so skip it when only the label is wanted
+    vader_scores = None
+    if include_sentiment or not emotion_scores:
+        vader_scores = get_vader_analyzer().polarity_scores(text)
     
     # Determine primary emotion
     if emotion_scores:
@@ -80,18 +297,202 @@ def detect_emotion(text):
         primary_emotion = max(emotion_scores, key=emotion_scores.get)
         
         # Calculate confidence based on keyword density
-        word_count = len(text_lower.split())
         confidence = min(emotion_scores[primary_emotion] / max(word_count / 20, 1), 1.0)
-        
-        return primary_emotion, confidence, emotion_scores
     
     # If no specific emotion keywords, use VADER sentiment as fallback
-    elif vader_scores['compound'] <= -0.3:
-        return 'sadness', abs(vader_scores['compound']), {'sadness': 1}
-    elif vader_scores['compound'] >= 0.3:
-        return 'hope', vader_scores['compound'], {'hope': 1}
     else:
-        return 'neutral', 0.5, {'neutral': 1}
+        primary_emotion, confidence, emotion_scores = _sentiment_fallback(vader_scores)
+
+    return EmotionAnalysis(primary_emotion, confidence, emotion_scores, vader_scores,
+                           spans, word_count, language)
+
+
+def _analysis_namespace(include_sentiment):
+    """Label-only and full analyses are cached separately"""
+    return 'analysis' if include_sentiment else 'emotion'
+
+
+def _analysis_cache_key(text, include_sentiment):
+    """
+    Cache key of analyze(text, include_sentiment)
+    Keyed on the exact text: keyword_spans are offsets into it, so a whitespace
+    variant must not share the entry
+    """
+    return make_cache_key(_analysis_namespace(include_sentiment), CLASSIFIER_VERSION, text)
+
+
+def analyze(text, include_sentiment=True):
+    """
+    Analyze text once: emotions, confidence, VADER scores, keyword spans, word count
+    With include_sentiment=False, VADER only runs as the no-keyword fallback
+    Results are cached by exact text and classifier version
+    Returns an EmotionAnalysis
+    """
+    key = _analysis_cache_key(text, include_sentiment)
+    cached = analysis_cache.get(key)
+    if cached is not None:
+        return EmotionAnalysis.from_dict(cached)
+
+    analysis = _run_analysis(text, include_sentiment)
+    analysis_cache.put(key, analysis.to_dict())
+    return analysis
+
+
+def detect_emotion(text):
+    """
+    Detect primary and secondary emotions in text
+    Returns: (primary_emotion, confidence, all_emotions_dict)
+    """
+    return analyze(text, include_sentiment=False).as_tuple()
+
+
+# Texts per task sent to a worker process, and the smallest batch worth a pool
+BATCH_CHUNK_SIZE = 500
+MIN_PARALLEL_BATCH = 2000
+
+_emotion_scorers = {}
+
+
+def get_emotion_scorer(language=DEFAULT_LANGUAGE):
+    """Vectorized batch scorer over one language's emotion lexicon, built on first use"""
+    if language not in _emotion_scorers:
+        # Deferred import: NumPy is only needed for batch labelling
+        from utils.emotion_matrix import EmotionMatrixScorer
+        _emotion_scorers[language] = EmotionMatrixScorer(EMOTION_LEXICONS[language])
+    return _emotion_scorers[language]
+
+
+def _analyze_chunk(texts, include_sentiment=True):
+    """Analyze one chunk of texts (runs inside a worker process)"""
+    # Uncached: the parent process owns the cache and stores what comes back
+    return [_run_analysis(text, include_sentiment).to_dict() for text in texts]
+
+
+def _label_chunk(texts):
+    """
+    Label one chunk with the document x emotion matrix (runs inside a worker process)
+    Texts are grouped by detected language and each group is scored against its
+    own lexicon. Only texts without keywords go through VADER, one at a time; with
+    the linear backend each group is labelled by one batched model call instead
+    Returns (primary_emotion, confidence, all_emotions_dict) per text
+    """
+    groups = {}
+    for position, text in enumerate(texts):
+        groups.setdefault(detect_language(text), []).append(position)
+
+    results = [None] * len(texts)
+    for language, positions in groups.items():
+        group_results = _label_language_group([texts[i] for i in positions], language)
+        for position, result in zip(positions, group_results):
+            results[position] = result
+    return results
+
+
+def _label_language_group(texts, language):
+    """_label_chunk for texts already known to be in one language"""
+    scorer = get_emotion_scorer(language)
+    scores = scorer.score(texts, keep_tokens=CLASSIFIER_BACKEND == 'linear')
+    emotions = scorer.emotions
+
+    if CLASSIFIER_BACKEND == 'linear':
+        # One batched sparse inference for the whole group; keyword counts are kept for context
+        predictions = get_linear_model().predict(scores['tokens'])
+        return [
+            _model_label(label, probability, {
+                emotion: int(count) for emotion, count in zip(emotions, counts) if count
+            })
+            for (label, probability), counts in zip(predictions, scores['counts'].tolist())
+        ]
+
+    results = []
+    for text, counts, primary, confidence, has_keywords in zip(
+        texts,
+        scores['counts'].tolist(),
+        scores['primary'].tolist(),
+        scores['confidence'].tolist(),
+        scores['has_keywords'].tolist()
+    ):
+        if has_keywords:
+            all_emotions = {emotion: int(count) for emotion, count in zip(emotions, counts) if count}
+            results.append((emotions[primary], confidence, all_emotions))
+        else:
+            results.append(_sentiment_fallback(get_vader_analyzer().polarity_scores(text)))
+    return results
+
+
+def _run_in_pool(chunk_func, texts, workers, chunk_size):
+    """Apply chunk_func to texts in chunks, using a process pool when the batch is big enough"""
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    if workers <= 1 or len(chunks) <= 1 or len(texts) < MIN_PARALLEL_BATCH:
+        return chunk_func(texts)
+
+    results = []
+    try:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            # map() yields chunk results in submission order
+            for chunk_results in pool.map(chunk_func, chunks):
+                results.extend(chunk_results)
+    except (OSError, BrokenProcessPool) as e:
+        print(f"❌ Error in emotion worker pool, running in-process: {e}")
+        return chunk_func(texts)
+    return results
+
+
+def _cached_batch(texts, namespace, chunk_func, workers, chunk_size):
+    """
+    Cached results for many texts in input order
+    Cached texts are answered here and repeated texts are computed once; only the
+    remaining texts go to chunk_func, whose JSON-serializable results are cached
+    by exact text
+    """
+    texts = list(texts)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    keys = [make_cache_key(namespace, CLASSIFIER_VERSION, text) for text in texts]
+    results = {}
+    pending = {}
+    for key, text in zip(keys, texts):
+        if key in results or key in pending:
+            continue
+        cached = analysis_cache.get(key)
+        if cached is None:
+            pending[key] = text
+        else:
+            results[key] = cached
+
+    if pending:
+        computed = _run_in_pool(chunk_func, list(pending.values()), workers, chunk_size)
+        new_results = list(zip(pending.keys(), computed))
+        analysis_cache.put_many(new_results)
+        results.update(new_results)
+
+    return [results[key] for key in keys]
+
+
+def analyze_batch(texts, workers=None, chunk_size=BATCH_CHUNK_SIZE, include_sentiment=True):
+    """
+    Run analyze() over many texts, fanning chunks out to worker processes
+    Each worker imports this module, so it has its own compiled lexicon and VADER
+    instance. Small batches (or workers=1) run in this process, since starting a
+    pool costs more than it saves
+    Returns a list of EmotionAnalysis in input order
+    """
+    chunk_func = partial(_analyze_chunk, include_sentiment=include_sentiment)
+    results = _cached_batch(texts, _analysis_namespace(include_sentiment), chunk_func, workers, chunk_size)
+    return [EmotionAnalysis.from_dict(result) for result in results]
+
+
+def detect_emotion_batch(texts, workers=None, chunk_size=BATCH_CHUNK_SIZE):
+    """
+    detect_emotion for many texts, scored as a matrix per chunk (see EmotionMatrixScorer)
+    Caching and process-pool fan-out work as in analyze_batch(). Labels are
+    keyed on the exact text too: the language is detected from its first
+    MAX_DETECTION_CHARS characters, which collapsing whitespace would shift
+    Returns a list of (primary_emotion, confidence, all_emotions_dict) in input order
+    """
+    results = _cached_batch(texts, 'label', _label_chunk, workers, chunk_size)
+    return [(emotion, confidence, dict(all_emotions)) for emotion, confidence, all_emotions in results]
 
 
 def get_emotion_summary(text):
@@ -99,18 +500,19 @@ def get_emotion_summary(text):
     Get a detailed emotion analysis summary
     Returns a dictionary with all detected emotions and their context
     """
-    primary_emotion, confidence, all_emotions = detect_emotion(text)
+    analysis = analyze(text)
+    all_emotions = analysis.emotion_counts
     
     # Sort emotions by score
     sorted_emotions = sorted(all_emotions.items(), key=lambda x: x[1], reverse=True)
     
     summary = {
-        'primary_emotion': primary_emotion,
-        'confidence': round(confidence, 2),
+        'primary_emotion': analysis.primary_emotion,
+        'confidence': round(analysis.confidence, 2),
         'all_emotions': dict(sorted_emotions),
         'emotion_count': len(all_emotions),
         'is_mixed': len(all_emotions) > 2,  # Multiple conflicting emotions
-        'vader_sentiment': vader_analyzer.polarity_scores(text)
+        'vader_sentiment': analysis.vader_scores
     }
     
     return summary
@@ -134,7 +536,7 @@ def get_emotion_label_display(emotion):
     return display_names.get(emotion, emotion.title())
 
 
-def analyze_story_batch(stories):
+def analyze_story_batch(stories, workers=None):
     """
     Analyze a batch of stories and return emotion statistics
     Useful for dashboard analytics
@@ -142,8 +544,7 @@ def analyze_story_batch(stories):
     emotion_counts = {}
     total_confidence = 0
     
-    for story in stories:
-        emotion, confidence, _ = detect_emotion(story)
+    for emotion, confidence, _ in detect_emotion_batch(stories, workers=workers):
         emotion_counts[emotion] = emotion_counts.get(emotion, 0) + 1
         total_confidence += confidence
     
@@ -0,0 +1,116 @@
+"""
+Story Submission Module
+Single write path for new stories: sanitize, classify, then save in one transaction
+"""
+
+import os
+import time
+
+from utils.database import save_story
+from utils.nlp_model import CLASSIFIER_VERSION, analyze
+from utils.privacy import sanitize_text
+
+# 'inline' labels stories during submission; 'background' saves them unlabelled
+# and lets utils.labelling_worker fill in the emotion afterwards
+LABELLING_MODE = os.environ.get('VOCES_LABELLING_MODE', 'inline')
+
+
+def _elapsed_ms(start):
+    """Milliseconds since a perf_counter() reading"""
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+def submit_story(story_text, support_choices, practitioner_note="", language="en"):
+    """
+    Sanitize, classify and store a story
+    NLP runs before the write starts, so the database write lock is only held
+    for a single INSERT that already carries the emotion label and confidence
+    In background labelling mode the story is saved unlabelled and queued instead,
+    and the returned analysis/emotion/confidence are None
+    Returns a dictionary with the story ID (None on failure), the cleaned text,
+    privacy warnings, the EmotionAnalysis (plus its emotion/confidence/counts for
+    convenience) and a timing breakdown in milliseconds
+    """
+    if LABELLING_MODE == 'background':
+        return _submit_for_background_labelling(
+            story_text, support_choices, practitioner_note, language
+        )
+
+    total_start = time.perf_counter()
+    timings = {}
+
+    # Remove personal information first so nothing identifying reaches NLP or storage
+    start = time.perf_counter()
+    cleaned_story, story_warnings = sanitize_text(story_text)
+    cleaned_note, note_warnings = sanitize_text(practitioner_note)
+    timings['sanitize_ms'] = _elapsed_ms(start)
+
+    start = time.perf_counter()
+    analysis = analyze(cleaned_story)
+    timings['classify_ms'] = _elapsed_ms(start)
+
+    start = time.perf_counter()
+    story_id = save_story(
+        story_text=cleaned_story,
+        support_choices=support_choices,
+        practitioner_note=cleaned_note,
+        language=language,
+        emotion_label=analysis.primary_emotion,
+        emotion_confidence=analysis.confidence,
+        features=analysis.features(),
+        classifier_version=CLASSIFIER_VERSION
+    )
+    timings['write_ms'] = _elapsed_ms(start)
+    timings['total_ms'] = _elapsed_ms(total_start)
+
+    return {
+        'story_id': story_id,
+        'cleaned_story': cleaned_story,
+        'cleaned_note': cleaned_note,
+        'warnings': story_warnings + note_warnings,
+        'analysis': analysis,
+        'emotion': analysis.primary_emotion,
+        'confidence': analysis.confidence,
+        'all_emotions': dict(analysis.emotion_counts),
+        'timings': timings
+    }
+
+
+def _submit_for_background_labelling(story_text, support_choices, practitioner_note, language):
+    """Sanitize and store a story, queueing it for the labelling worker"""
+    # Deferred import: the worker module is only needed in background mode
+    from utils.labelling_worker import start_labelling_worker
+
+    total_start = time.perf_counter()
+    timings = {}
+
+    start = time.perf_counter()
+    cleaned_story, story_warnings = sanitize_text(story_text)
+    cleaned_note, note_warnings = sanitize_text(practitioner_note)
+    timings['sanitize_ms'] = _elapsed_ms(start)
+
+    start = time.perf_counter()
+    story_id = save_story(
+        story_text=cleaned_story,
+        support_choices=support_choices,
+        practitioner_note=cleaned_note,
+        language=language,
+        enqueue_labelling=True
+    )
+    timings['write_ms'] = _elapsed_ms(start)
+
+    if story_id:
+        start_labelling_worker().notify()
+    timings['total_ms'] = _elapsed_ms(total_start)
+
+    return {
+        'story_id': story_id,
+        'cleaned_story': cleaned_story,
+        'cleaned_note': cleaned_note,
+        'warnings': story_warnings + note_warnings,
+        'analysis': None,
+        'emotion': None,
+        'confidence': None,
+        'all_emotions': {},
+        'timings': timings
+    }
@@ -0,0 +1,237 @@
+"""
+Memory-Mapped VADER Lexicon Module
+Compiles VADER's lexicon text files into one read-only binary file that every process maps instead of parsing
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import threading
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+
+try:
+    from vaderSentiment import vaderSentiment as _vader_module
+except (ImportError, ModuleNotFoundError):
+    import vaderSentiment as _vader_module
+
+SentimentIntensityAnalyzer = _vader_module.SentimentIntensityAnalyzer
+
+VADER_DIR = Path(_vader_module.__file__).resolve().parent
+VADER_LEXICON_FILES = ("vader_lexicon.txt", "emoji_utf8_lexicon.txt")
+
+# Compiled next to the database; rebuilt automatically when the installed VADER files change
+VADER_LEXICON_PATH = Path(os.environ.get(
+    "VOCES_VADER_LEXICON", Path(__file__).parent.parent / "data" / "vader_lexicon.bin"
+))
+
+# magic, source signature, then the byte position of each section:
+# word offsets, word bytes, valences, emoji offsets, emoji bytes, description offsets, description bytes
+_MAGIC = b"VOXLEX01"
+_HEADER = struct.Struct("<8s16s7QII")
+
+# VADER valences have at most one decimal; rounding to this undoes the float32 storage error
+VALENCE_DECIMALS = 4
+
+# Per-process memo of recent lookups; word frequencies are skewed, so this stays small and hot
+MAX_MEMO_SIZE = 8192
+
+
+def _source_signature():
+    """Size and mtime of the installed VADER lexicon files, hashed into 16 bytes"""
+    parts = []
+    for name in VADER_LEXICON_FILES:
+        stat = (VADER_DIR / name).stat()
+        parts.append(f"{name}:{stat.st_size}:{stat.st_mtime_ns}")
+    return hashlib.sha256("|".join(parts).encode("utf-8")).digest()[:16]
+
+
+def _read_pairs(name):
+    """Tab-separated (key, value) pairs from one of VADER's lexicon files"""
+    pairs = {}
+    with open(VADER_DIR / name, encoding="utf-8") as lexicon_file:
+        for line in lexicon_file:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) >= 2 and fields[0]:
+                pairs[fields[0]] = fields[1]
+    return pairs
+
+
+def _string_table(strings):
+    """(offsets, blob) for a list of strings: string i is blob[offsets[i]:offsets[i + 1]]"""
+    encoded = [string.encode("utf-8") for string in strings]
+    offsets = array("I", [0])
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    return offsets.tobytes(), b"".join(encoded)
+
+
+def build_lexicon_file(path=VADER_LEXICON_PATH):
+    """
+    Parse VADER's text lexicons once and write them as a memory-mappable file
+    Keys are sorted by their UTF-8 bytes so lookups can binary search them in place.
+    The file is written under a temporary name and renamed, so readers never see half of it
+    """
+    path = Path(path)
+    words = _read_pairs(VADER_LEXICON_FILES[0])
+    emojis = _read_pairs(VADER_LEXICON_FILES[1])
+
+    word_keys = sorted(words, key=lambda word: word.encode("utf-8"))
+    emoji_keys = sorted(emojis, key=lambda emoji: emoji.encode("utf-8"))
+    sections = [
+        *_string_table(word_keys),
+        array("f", [float(words[word]) for word in word_keys]).tobytes(),
+        *_string_table(emoji_keys),
+        *_string_table([emojis[emoji] for emoji in emoji_keys])
+    ]
+
+    # Every section starts on a 4-byte boundary so it can be cast in place
+    positions, body, position = [], [], _HEADER.size
+    for section in sections:
+        padding = -position % 4
+        body.append(b"\0" * padding)
+        position += padding
+        positions.append(position)
+        body.append(section)
+        position += len(section)
+
+    header = _HEADER.pack(_MAGIC, _source_signature(), *positions, len(word_keys), len(emoji_keys))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(temporary, "wb") as lexicon_file:
+        lexicon_file.write(header)
+        lexicon_file.write(b"".join(body))
+    os.replace(temporary, path)
+    return path
+
+
+class MappedLexicon:
+    """
+    Read-only dict-like view of a sorted string table inside a memory map
+    Supports the operations VADER uses (in, [], get); values are either a
+    float32 section or a second string table. Nothing is copied out of the
+    map except the entries a process actually looks up
+    """
+
+    def __init__(self, buffer, offsets_position, keys_position, count, values):
+        self._buffer = buffer
+        self._offsets = buffer[offsets_position:offsets_position + 4 * (count + 1)].cast("I")
+        self._keys_position = keys_position
+        self._values = values
+        self._count = count
+        self._memo = {}
+
+    def _key(self, index):
+        start = self._keys_position + self._offsets[index]
+        return self._buffer[start:start + self._offsets[index + 1] - self._offsets[index]]
+
+    def _find(self, key):
+        """Binary search for key; returns its index or -1 and memoizes the answer"""
+        encoded = key.encode("utf-8") if isinstance(key, str) else b""
+        index = bisect_left(range(self._count), encoded, key=lambda i: self._key(i).tobytes())
+        if index >= self._count or self._key(index) != encoded:
+            index = -1
+        if len(self._memo) >= MAX_MEMO_SIZE:
+            self._memo.clear()
+        self._memo[key] = index
+        return index
+
+    # VADER calls these several times per word, so the memo is checked inline
+    def __contains__(self, key):
+        index = self._memo.get(key)
+        if index is None:
+            index = self._find(key)
+        return index >= 0
+
+    def __getitem__(self, key):
+        index = self._memo.get(key)
+        if index is None:
+            index = self._find(key)
+        if index < 0:
+            raise KeyError(key)
+        return self._values(index)
+
+    def get(self, key, default=None):
+        index = self._memo.get(key)
+        if index is None:
+            index = self._find(key)
+        return self._values(index) if index >= 0 else default
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        return (self._key(index).tobytes().decode("utf-8") for index in range(self._count))
+
+
+def _open_lexicon_file(path):
+    """Map path and check it is a current lexicon file; returns (buffer, header fields) or None"""
+    try:
+        with open(path, "rb") as lexicon_file:
+            mapped = mmap.mmap(lexicon_file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    buffer = memoryview(mapped)
+    if len(buffer) < _HEADER.size:
+        return None
+    fields = _HEADER.unpack_from(buffer)
+    if fields[0] != _MAGIC or fields[1] != _source_signature():
+        return None
+    return buffer, fields[2:]
+
+
+def load_vader_lexicons(path=VADER_LEXICON_PATH):
+    """
+    (lexicon, emojis) as MappedLexicon views of the compiled file
+    Builds the file first when it is missing or was compiled from other VADER files
+    """
+    opened = _open_lexicon_file(path)
+    if opened is None:
+        build_lexicon_file(path)
+        opened = _open_lexicon_file(path)
+        if opened is None:
+            raise OSError(f"could not map the compiled VADER lexicon at {path}")
+
+    buffer, (word_offsets, word_keys, valences, emoji_offsets, emoji_keys,
+             description_offsets, description_keys, word_count, emoji_count) = opened
+
+    valence_view = buffer[valences:valences + 4 * word_count].cast("f")
+    descriptions = MappedLexicon(buffer, description_offsets, description_keys, emoji_count, None)
+
+    def valence(index):
+        return round(valence_view[index], VALENCE_DECIMALS)
+
+    def description(index):
+        return descriptions._key(index).tobytes().decode("utf-8")
+
+    lexicon = MappedLexicon(buffer, word_offsets, word_keys, word_count, valence)
+    emojis = MappedLexicon(buffer, emoji_offsets, emoji_keys, emoji_count, description)
+    return lexicon, emojis
+
+
+class MappedSentimentAnalyzer(SentimentIntensityAnalyzer):
+    """
+    SentimentIntensityAnalyzer reading its lexicons from the compiled, memory-mapped file
+    Scores are identical to the stock analyzer; construction skips parsing the text files
+    """
+
+    def __init__(self, path=VADER_LEXICON_PATH):
+        self.lexicon, self.emojis = load_vader_lexicons(path)
+
+
+_build_lock = threading.Lock()
+
+
+def create_sentiment_analyzer(path=VADER_LEXICON_PATH):
+    """
+    MappedSentimentAnalyzer, or the stock analyzer if the compiled file can't be built or read
+    (e.g. a read-only data directory)
+    """
+    try:
+        with _build_lock:
+            return MappedSentimentAnalyzer(path)
+    except OSError as e:
+        print(f"❌ Error mapping VADER lexicon, parsing it instead: {e}")
+        return SentimentIntensityAnalyzer()
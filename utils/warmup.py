@@ -0,0 +1,47 @@
+"""
+Resource Warm-up Module
+Initializes shared, process-wide resources (database schema, NLP models) off the request path
+"""
+
+import threading
+
+import streamlit as st
+
+
+def warm_up():
+    """
+    Initialize the database and NLP resources now instead of on first use
+    Safe to call more than once: every step is a no-op once done
+    """
+    # Deferred imports: pages that only need the database shouldn't import NLP up front
+    from utils.database import ensure_database
+    from utils.nlp_model import get_vader_analyzer
+    from utils.submission import LABELLING_MODE
+
+    ensure_database()
+    get_vader_analyzer()
+
+    if LABELLING_MODE == 'background':
+        from utils.labelling_worker import start_labelling_worker
+        start_labelling_worker()
+
+
+def _warm_up_safely():
+    """Thread target: a failed warm-up just leaves initialization to first use"""
+    try:
+        warm_up()
+        print("🔥 Resources warmed up")
+    except Exception as e:
+        print(f"❌ Error warming up resources: {e}")
+
+
+@st.cache_resource(show_spinner=False)
+def start_warm_up():
+    """
+    Start warm-up in a background thread, once per server process
+    Called at the top of every page; st.cache_resource makes every call after the
+    first (from any session) return the same thread immediately
+    """
+    thread = threading.Thread(target=_warm_up_safely, name="voces-warm-up", daemon=True)
+    thread.start()
+    return thread
@@ -3,11 +3,22 @@ Web Scraping Module for External Latina Wellness Content
 Collects public content from blogs, forums, and social media
 """
 
-import requests
 from bs4 import BeautifulSoup
-import time
 from datetime import datetime
+from functools import partial
+import json
 import re
+from urllib.parse import urljoin
+
+from utils.crawl_frontier import (
+    CrawlFrontier, DEFAULT_DOMAIN_BUDGET, DEFAULT_MAX_DEPTH, canonicalize_url, domain_of
+)
+from utils.database import clear_crawl_frontier, get_crawl_frontier, save_crawl_frontier
+from utils.feed_reader import fetch_feed, is_feed_url
+from utils.fetch_engine import FetchEngine, fetch_url, get_session
+from utils.http_cache import get_http_cache
+from utils.language import detect_language
+from utils.lexicon import CompiledLexicon
 
 # Sample public Latina wellness blogs and resources
 PUBLIC_SOURCES = {
@@ -33,6 +44,246 @@ WELLNESS_KEYWORDS = [
     'motherhood', 'work-life balance', 'emotional health'
 ]
 
+# Subreddits whose hot listings are collected alongside PUBLIC_SOURCES
+REDDIT_SUBREDDITS = ['LatinoPeopleTwitter']
+
+BLOG_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+REDDIT_HEADERS = {'User-Agent': 'WellnessResearchBot/1.0'}
+
+
+def is_wellness_related(text):
+    """Same relevance test for every source: substantial text mentioning a wellness keyword"""
+    return len(text) > 100 and any(keyword in text.lower() for keyword in WELLNESS_KEYWORDS)
+
+
+def keyword_hits(text):
+    """How many times WELLNESS_KEYWORDS occur in text (the crawl frontier's priority signal)"""
+    lowered = text.lower()
+    return sum(lowered.count(keyword) for keyword in WELLNESS_KEYWORDS)
+
+
+def parse_blog_content(content, url, max_articles=10, source_type='blog'):
+    """
+    Extract wellness-related articles from a fetched blog page
+    content: the page body (bytes or str); url: where it came from
+    """
+    return _extract_articles(BeautifulSoup(content, 'html.parser'), url, max_articles, source_type)
+
+
+def _extract_articles(soup, url, max_articles, source_type):
+    """parse_blog_content() on an already parsed page"""
+    articles = []
+
+    # Generic blog post extraction (adjust selectors based on actual sites)
+    posts = soup.find_all(['article', 'div'], class_=re.compile('post|article|entry'), limit=max_articles)
+
+    for post in posts:
+        # Extract title
+        title_elem = post.find(['h1', 'h2', 'h3'], class_=re.compile('title|heading'))
+        title = title_elem.get_text(strip=True) if title_elem else "No title"
+
+        # Extract content
+        content_elem = post.find(['div', 'p'], class_=re.compile('content|body|text|excerpt'))
+        text = content_elem.get_text(strip=True) if content_elem else ""
+
+        # Only include if content is substantial and relevant
+        if is_wellness_related(text):
+            article = {
+                'title': title,
+                'content': text,
+                'source': url,
+                'source_type': source_type,
+                'timestamp': datetime.now().isoformat()
+            }
+            # The article's own link identifies it across crawls
+            link = post.find('a', href=True)
+            if link:
+                article['url'] = urljoin(url, link['href'])
+            articles.append(article)
+
+    return articles
+
+
+def reddit_listing_url(subreddit, limit=20, listing='hot'):
+    """Public JSON listing of a subreddit's posts ('hot', or 'new' for newest first)"""
+    return f"https://www.reddit.com/r/{subreddit}/{listing}.json?limit={limit}"
+
+
+def reddit_source(subreddit):
+    """Source name stored with (and crawl state kept for) a subreddit's posts"""
+    return f"reddit.com/r/{subreddit}"
+
+
+def parse_reddit_listing(data, subreddit, since=None):
+    """
+    Extract wellness-related posts from a decoded Reddit listing
+    since: created_utc high-water mark; older posts are skipped before any text work
+    """
+    posts = []
+
+    for post_data in data['data']['children']:
+        post = post_data['data']
+        created = post.get('created_utc', 0)
+        if since is not None and created <= since:
+            continue
+
+        # Combine title and selftext
+        text = f"{post.get('title', '')} {post.get('selftext', '')}"
+
+        # Filter for wellness-related content
+        if any(keyword in text.lower() for keyword in WELLNESS_KEYWORDS) and len(text) > 50:
+            posts.append({
+                'title': post.get('title', ''),
+                'content': text,
+                'source': reddit_source(subreddit),
+                'source_type': 'reddit',
+                'timestamp': datetime.fromtimestamp(created).isoformat(),
+                'item_id': f"reddit:{post.get('name') or post.get('id')}",
+                'published_epoch': created
+            })
+
+    return posts
+
+
+def _article_from_page(soup, url, source_type='blog'):
+    """The full text of a linked article page as a scraper item, or None if it isn't relevant"""
+    container = soup.find('article') or soup.find('main') or soup.body or soup
+    text = " ".join(p.get_text(" ", strip=True) for p in container.find_all('p'))
+    if not is_wellness_related(text):
+        return None
+    title_elem = soup.find('h1') or soup.title
+    return {
+        'title': title_elem.get_text(strip=True) if title_elem else "No title",
+        'content': text,
+        'source': url,
+        'source_type': source_type,
+        'timestamp': datetime.now().isoformat(),
+        'url': url
+    }
+
+
+def _link_priority(link, anchor_text, page_hits):
+    """Keyword hits in a link's anchor text and URL slug, plus half of its page's hits"""
+    slug = re.sub(r"[-_/.]+", " ", link)
+    return keyword_hits(f"{anchor_text} {slug}") + 0.5 * page_hits
+
+
+def crawl_blog_sources(seeds=None, engine=None, max_depth=DEFAULT_MAX_DEPTH,
+                       domain_budget=DEFAULT_DOMAIN_BUDGET, max_articles=10, batch_size=None,
+                       crawl_state=None, crawl_name='blog_sources', resume=True):
+    """
+    Crawl from blog index pages into the articles they link to
+    Pages come off a CrawlFrontier highest priority first: links are scored by
+    WELLNESS_KEYWORDS hits in their anchor text and URL and on the page linking
+    to them. Each batch is fetched through the FetchEngine (rate limits, HTTP
+    cache) and the frontier is checkpointed after it together with the items
+    found so far, so an interrupted crawl resumes where it stopped without
+    losing them. With a CrawlState, article URLs already ingested are skipped
+    before fetching, and the checkpoint is only cleared by its save(), once the
+    items are stored; without one it is cleared when the crawl finishes
+    Index-page excerpts without a link are returned as they are; linked posts
+    are returned as their full article instead. An excerpt is still returned
+    when its link can't be followed (another domain, over budget, too deep) or
+    the linked page yields no article
+    """
+    seeds = seeds if seeds is not None else [
+        url for url in PUBLIC_SOURCES['blogs'] + PUBLIC_SOURCES['communities_and_resources']
+        if not is_feed_url(url)
+    ]
+    engine = engine or FetchEngine(cache=get_http_cache())
+    batch_size = batch_size or engine.max_concurrency * 2
+    community_domains = {domain_of(url) for url in PUBLIC_SOURCES['communities_and_resources']}
+
+    state = get_crawl_frontier(crawl_name) if resume else None
+    if state:
+        checkpoint = json.loads(state)
+        frontier = CrawlFrontier.from_dict(checkpoint['frontier'])
+        items = checkpoint['items']
+        excerpts = checkpoint['excerpts']
+        covered = set(checkpoint['covered'])
+        print(f"🔁 Resuming crawl with {len(frontier)} queued pages "
+              f"({frontier.fetched} fetched, {len(items)} items)")
+    else:
+        frontier = CrawlFrontier(max_depth, domain_budget)
+        frontier.seed(seeds)
+        items = []
+        # Index excerpts waiting on their linked page (by canonical URL), and
+        # pages that yielded a full article
+        excerpts = {}
+        covered = set()
+
+    while len(frontier):
+        batch = frontier.pop_batch(batch_size)
+        if crawl_state:
+            known = crawl_state.known_urls([entry['url'] for entry in batch if entry['depth'] > 0])
+            batch = [entry for entry in batch if entry['url'] not in known]
+            for url in known:
+                excerpts.pop(url, None)
+
+        for result in engine.fetch_all([dict(entry, headers=BLOG_HEADERS) for entry in batch]):
+            url, depth = result['url'], result['depth']
+            article = None
+            try:
+                if result['error']:
+                    raise RuntimeError(result['error'])
+                if result['status'] >= 400:
+                    raise RuntimeError(f"HTTP {result['status']}")
+
+                # Unchanged pages are parsed from the cached body; CrawlState drops stored items
+                soup = BeautifulSoup(result['content'], 'html.parser')
+                page_hits = keyword_hits(soup.get_text(" "))
+                source_type = 'community' if domain_of(url) in community_domains else 'blog'
+                if depth == 0:
+                    for excerpt in _extract_articles(soup, url, max_articles, source_type):
+                        link = canonicalize_url(excerpt['url']) if 'url' in excerpt else None
+                        # Score the linked post by its excerpt, which says more than its anchor
+                        if link and frontier.add(link, 1, keyword_hits(excerpt['content']) + 0.5 * page_hits):
+                            excerpts[link] = excerpt
+                        elif link in covered or link in excerpts:
+                            continue
+                        elif link and frontier.is_queued(link):
+                            excerpts[link] = excerpt
+                        else:
+                            items.append(excerpt)
+                else:
+                    article = _article_from_page(soup, url, source_type)
+
+                for link in soup.find_all('a', href=True):
+                    target = urljoin(url, link['href'])
+                    frontier.add(target, depth + 1, _link_priority(target, link.get_text(" ", strip=True), page_hits))
+            except Exception as e:
+                print(f"❌ Error crawling {url}: {e}")
+
+            # A linked page that failed or held no article falls back to its excerpt
+            fallback = excerpts.pop(url, None)
+            if article:
+                items.append(article)
+                covered.add(url)
+            elif fallback:
+                items.append(fallback)
+
+        # Excerpts whose page was dropped from the queue are kept as they are
+        if not len(frontier):
+            items.extend(excerpts.values())
+            excerpts = {}
+
+        # The batch's items go in the same write as the frontier that marks their pages fetched
+        save_crawl_frontier(crawl_name, json.dumps({
+            'frontier': frontier.to_dict(),
+            'items': items,
+            'excerpts': excerpts,
+            'covered': sorted(covered)
+        }))
+        print(f"🕸️  Crawled {frontier.fetched} pages, {len(frontier)} queued, {len(items)} items")
+
+    if crawl_state:
+        crawl_state.finish_crawl(crawl_name)
+    else:
+        clear_crawl_frontier(crawl_name)
+    return items
+
 
 def scrape_blog_content(url, max_articles=10):
     """
@@ -42,36 +293,22 @@ def scrape_blog_content(url, max_articles=10):
     articles = []
     
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
+        if is_feed_url(url):
+            # RSS/Atom: streamed through the incremental feed parser instead of html.parser.
+            # Uncached: nothing here records the items, so a 304 would lose them
+            response = fetch_feed(get_session(), url, BLOG_HEADERS, is_relevant=is_wellness_related)
+            if response['status'] >= 400:
+                raise RuntimeError(f"HTTP {response['status']}")
+            articles = response['items']
+            print(f"✅ Scraped {len(articles)} feed items from {url}")
+            return articles
         
-        # Generic blog post extraction (adjust selectors based on actual sites)
-        posts = soup.find_all(['article', 'div'], class_=re.compile('post|article|entry'), limit=max_articles)
+        # Conditional GET on a keep-alive session: an unchanged page is served from the HTTP cache
+        response = fetch_url(get_session(), url, BLOG_HEADERS, cache=get_http_cache())
+        if response['status'] >= 400:
+            raise RuntimeError(f"HTTP {response['status']}")
         
-        for post in posts:
-            # Extract title
-            title_elem = post.find(['h1', 'h2', 'h3'], class_=re.compile('title|heading'))
-            title = title_elem.get_text(strip=True) if title_elem else "No title"
-            
-            # Extract content
-            content_elem = post.find(['div', 'p'], class_=re.compile('content|body|text|excerpt'))
-            content = content_elem.get_text(strip=True) if content_elem else ""
-            
-            # Only include if content is substantial and relevant
-            if len(content) > 100 and any(keyword in content.lower() for keyword in WELLNESS_KEYWORDS):
-                articles.append({
-                    'title': title,
-                    'content': content,
-                    'source': url,
-                    'source_type': 'blog',
-                    'timestamp': datetime.now().isoformat()
-                })
+        articles = parse_blog_content(response['content'], url, max_articles)
         
         print(f"✅ Scraped {len(articles)} articles from {url}")
         
@@ -88,29 +325,12 @@ def scrape_reddit_wellness(subreddit='LatinoPeopleTwitter', limit=20):
     posts = []
     
     try:
-        url = f"https://www.reddit.com/r/{subreddit}/hot.json?limit={limit}"
-        headers = {'User-Agent': 'WellnessResearchBot/1.0'}
+        response = fetch_url(get_session(), reddit_listing_url(subreddit, limit), REDDIT_HEADERS,
+                             cache=get_http_cache())
+        if response['status'] >= 400:
+            raise RuntimeError(f"HTTP {response['status']}")
         
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        for post_data in data['data']['children']:
-            post = post_data['data']
-            
-            # Combine title and selftext
-            text = f"{post.get('title', '')} {post.get('selftext', '')}"
-            
-            # Filter for wellness-related content
-            if any(keyword in text.lower() for keyword in WELLNESS_KEYWORDS) and len(text) > 50:
-                posts.append({
-                    'title': post.get('title', ''),
-                    'content': text,
-                    'source': f"reddit.com/r/{subreddit}",
-                    'source_type': 'reddit',
-                    'timestamp': datetime.fromtimestamp(post.get('created_utc', 0)).isoformat()
-                })
+        posts = parse_reddit_listing(json.loads(response['content']), subreddit)
         
         print(f"✅ Scraped {len(posts)} posts from r/{subreddit}")
         
@@ -120,6 +340,81 @@ def scrape_reddit_wellness(subreddit='LatinoPeopleTwitter', limit=20):
     return posts
 
 
+def collect_public_sources(subreddits=None, reddit_limit=10, max_articles=10, engine=None,
+                           crawl_state=None, follow_links=False):
+    """
+    Fetch every PUBLIC_SOURCES page and the Reddit listings concurrently, then parse them
+    Hosts are fetched in parallel (each under its own rate limit), so this takes
+    about as long as the slowest host rather than the sum of all of them.
+    Requests are revalidated against the HTTP cache; a page the server answers
+    with 304 Not Modified is parsed from its cached body (a 304 only means the
+    page was fetched before, not that its items were stored: CrawlState drops
+    the ones that were).
+    Feed URLs are streamed through the incremental RSS/Atom parser instead; only
+    with a CrawlState are they requested conditionally, with the validators its
+    save() stored in crawl_sources.
+    With a CrawlState, Reddit is read newest-first, and Reddit posts and feed
+    entries at or below their source's high-water mark are skipped while parsing.
+    With follow_links, HTML sources are crawled into their linked articles by
+    crawl_blog_sources() instead of reading only the index page
+    """
+    engine = engine or FetchEngine(cache=get_http_cache())
+    subreddits = REDDIT_SUBREDDITS if subreddits is None else subreddits
+    listing = 'new' if crawl_state else 'hot'
+    feed_urls = [url for url in PUBLIC_SOURCES['blogs'] if is_feed_url(url)]
+    if crawl_state:
+        crawl_state.load([reddit_source(subreddit) for subreddit in subreddits] + feed_urls)
+
+    html_fetches = [
+        {'url': url, 'headers': BLOG_HEADERS, 'kind': 'blog', 'source_type': 'blog'}
+        for url in PUBLIC_SOURCES['blogs'] if not is_feed_url(url)
+    ] + [
+        {'url': url, 'headers': BLOG_HEADERS, 'kind': 'blog', 'source_type': 'community'}
+        for url in PUBLIC_SOURCES['communities_and_resources']
+    ]
+
+    fetches = [
+        {'url': url, 'headers': BLOG_HEADERS, 'kind': 'feed',
+         'fetch': partial(fetch_feed, since=crawl_state.since(url) if crawl_state else None,
+                          validators=crawl_state.validators(url) if crawl_state else None,
+                          is_relevant=is_wellness_related)}
+        for url in feed_urls
+    ] + ([] if follow_links else html_fetches) + [
+        {'url': reddit_listing_url(subreddit, reddit_limit, listing), 'headers': REDDIT_HEADERS,
+         'kind': 'reddit', 'subreddit': subreddit}
+        for subreddit in subreddits
+    ]
+
+    items = []
+    for result in engine.fetch_all(fetches):
+        url = result['url']
+        try:
+            if result['error']:
+                raise RuntimeError(result['error'])
+            if result['status'] >= 400:
+                raise RuntimeError(f"HTTP {result['status']}")
+            if result['kind'] == 'feed':
+                found = result['items']
+                if crawl_state:
+                    crawl_state.defer_validators(url, result.get('validators'))
+            elif result['kind'] == 'reddit':
+                since = crawl_state.since(reddit_source(result['subreddit'])) if crawl_state else None
+                found = parse_reddit_listing(json.loads(result['content']), result['subreddit'], since)
+            else:
+                found = parse_blog_content(result['content'], url, max_articles, result['source_type'])
+            items.extend(found)
+            unchanged = ", unchanged" if result['not_modified'] else ""
+            print(f"✅ Scraped {len(found)} items from {url} ({result['elapsed']:.1f}s{unchanged})")
+        except Exception as e:
+            print(f"❌ Error scraping {url}: {e}")
+
+    if follow_links:
+        items.extend(crawl_blog_sources([fetch['url'] for fetch in html_fetches], engine=engine,
+                                        crawl_state=crawl_state))
+
+    return items
+
+
 def generate_synthetic_content():
     """
     Generate synthetic external content for testing/demo purposes
@@ -201,30 +496,48 @@ def generate_synthetic_content():
     return synthetic_posts
 
 
+# Theme keyword dictionary for external content
+THEME_KEYWORDS = {
+    'boundaries': ['boundary', 'boundaries', 'saying no', 'limits'],
+    'caregiving': ['caretaker', 'caregiving', 'taking care', 'caring for'],
+    'family_expectations': ['family expectation', 'family expectations', 'cultural expectation',
+                            'cultural expectations', 'tradition', 'familia'],
+    'work_stress': ['work stress', 'job', 'workplace', 'career', 'burnout'],
+    'self_care': ['self-care', 'self care', 'me time', 'rest'],
+    'guilt': ['guilt', 'guilty', 'shame', 'ashamed'],
+    'healing': ['healing', 'therapy', 'counseling', 'growth'],
+    'joy': ['joy', 'happy', 'grateful', 'peace', 'hope'],
+    'cultural_identity': ['cultural', 'identity', 'heritage', 'roots', 'tradition']
+}
+
+# Spanish keywords for the same themes
+THEME_KEYWORDS_ES = {
+    'boundaries': ['límites', 'limites', 'decir que no', 'poner límites'],
+    'caregiving': ['cuidadora', 'cuidando', 'cuidar a'],
+    'family_expectations': ['expectativas familiares', 'expectativas culturales', 'tradición',
+                            'tradicion', 'familia'],
+    'work_stress': ['estrés laboral', 'estres laboral', 'trabajo', 'empleo', 'carrera', 'agotamiento'],
+    'self_care': ['autocuidado', 'cuidarme', 'descanso', 'tiempo para mí', 'tiempo para mi'],
+    'guilt': ['culpa', 'culpable', 'vergüenza', 'verguenza'],
+    'healing': ['sanación', 'sanacion', 'sanar', 'terapia', 'consejería', 'crecimiento'],
+    'joy': ['alegría', 'alegria', 'feliz', 'agradecida', 'paz', 'esperanza'],
+    'cultural_identity': ['cultural', 'identidad', 'herencia', 'raíces', 'raices', 'tradición']
+}
+
+# Compiled once per language; each text is matched against its detected language only
+THEME_LEXICONS = {
+    'en': CompiledLexicon(THEME_KEYWORDS),
+    'es': CompiledLexicon(THEME_KEYWORDS_ES)
+}
+THEME_LEXICON = THEME_LEXICONS['en']
+
+
 def classify_theme(text):
     """
     Classify the main theme of the text
     """
-    theme_keywords = {
-        'boundaries': ['boundary', 'boundaries', 'saying no', 'limits'],
-        'caregiving': ['caretaker', 'caregiving', 'taking care', 'caring for'],
-        'family_expectations': ['family expectation', 'cultural expectation', 'tradition', 'familia'],
-        'work_stress': ['work stress', 'job', 'workplace', 'career', 'burnout'],
-        'self_care': ['self-care', 'self care', 'me time', 'rest'],
-        'guilt': ['guilt', 'guilty', 'shame', 'ashamed'],
-        'healing': ['healing', 'therapy', 'counseling', 'growth'],
-        'joy': ['joy', 'happy', 'grateful', 'peace', 'hope'],
-        'cultural_identity': ['cultural', 'identity', 'heritage', 'roots', 'tradition']
-    }
-    
-    text_lower = text.lower()
-    
-    # Count matches for each theme
-    theme_scores = {}
-    for theme, keywords in theme_keywords.items():
-        score = sum(1 for keyword in keywords if keyword in text_lower)
-        if score > 0:
-            theme_scores[theme] = score
+    # Count matches for each theme (whole-word matches in the text's own language)
+    theme_scores = THEME_LEXICONS[detect_language(text)].count(text)
     
     # Return primary theme or 'general'
     if theme_scores:
@@ -233,10 +546,13 @@ def classify_theme(text):
         return 'general_wellness'
 
 
-def collect_external_content(use_synthetic=True):
+def collect_external_content(use_synthetic=True, crawl_state=None, follow_links=False):
     """
     Main function to collect external content
     Set use_synthetic=True for demo/testing without real scraping
+    With a CrawlState, items ingested by earlier runs are dropped before themes
+    are classified (the caller saves the state after storing the new items).
+    follow_links crawls blog index pages into the articles they link to
     """
     all_content = []
     
@@ -246,15 +562,12 @@ def collect_external_content(use_synthetic=True):
     else:
         print("🌐 Collecting content from public sources...")
         
-        # Scrape Reddit (public API)
-        reddit_posts = scrape_reddit_wellness('LatinoPeopleTwitter', limit=10)
-        all_content.extend(reddit_posts)
-        
-        time.sleep(2)  # Rate limiting
-        
-        # Add more sources here as needed
-        # blog_posts = scrape_blog_content('https://actual-blog-url.com')
-        # all_content.extend(blog_posts)
+        # Blogs, community pages and Reddit, fetched concurrently with per-host rate limits
+        all_content = collect_public_sources(crawl_state=crawl_state, follow_links=follow_links)
+    
+    if crawl_state:
+        all_content = crawl_state.filter_new(all_content)
+        print(f"⏭️  Skipped {crawl_state.skipped} items ingested by earlier runs")
     
     # Classify themes for all content
     for item in all_content: